@@ -1,18 +1,82 @@
-from fastapi import FastAPI
-from schemas import InsuranceInput, PredictionResponse
-from src.pipeline.prediction import PredictionPipeline
+import os
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from schemas import InsuranceInput, PredictionResponse, BatchInsuranceInput, BatchPredictionResponse
+from src.pipeline.model_registry import model_registry, warm_up, predict_record, predict_records
+from src.pipeline.micro_batcher import MicroBatcher
+from src.pipeline.inference_executor import BoundedInferenceExecutor, ExecutorSaturatedError
+
+micro_batcher = None
+if os.getenv("PREDICTION_MICRO_BATCHING_ENABLED", "false").lower() == "true":
+    micro_batcher = MicroBatcher(model_registry.get)
+
+executor = BoundedInferenceExecutor(initializer=warm_up)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The model is loaded lazily on the first request if warm-up fails.
+    warm_up()
+    if micro_batcher is not None:
+        micro_batcher.start()
+    yield
+    if micro_batcher is not None:
+        micro_batcher.stop()
+    executor.shutdown()
+    model_registry.clear()
+
 
 app = FastAPI(
     title="Insurance Prediction API",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(ExecutorSaturatedError)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturatedError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 @app.post("/predict", response_model=PredictionResponse)
-def predict(data: InsuranceInput):
-    predictor = PredictionPipeline()
-    result = predictor.predict(data.dict())
-    return result
+async def predict(data: InsuranceInput):
+    if micro_batcher is not None:
+        return await executor.wait(micro_batcher.submit, data.dict())
+    return await executor.run(predict_record, data.dict())
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+async def predict_batch(data: BatchInsuranceInput):
+    records = [record.dict() for record in data.records]
+    results = await executor.run(predict_records, records, data.chunk_size)
+    return {"predictions": results}
+
+@app.post("/model/reload")
+def reload_model(model_name: str = None, version: str = None):
+    try:
+        predictor = model_registry.reload(model_name, version)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {e}")
+    if executor.kind == "process":
+        executor.restart()
+    return {"model_name": predictor.model_name, "version": predictor.version, "status": "reloaded"}
+
+@app.post("/model/invalidate")
+def invalidate_model(model_name: str = None, version: str = None):
+    invalidated = model_registry.invalidate(model_name, version)
+    if executor.kind == "process":
+        executor.restart()
+    return {"invalidated": invalidated}
+
+@app.get("/model")
+def loaded_models():
+    return {"loaded_models": model_registry.loaded_models()}
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "executor": executor.stats(),
+        "micro_batching": micro_batcher.stats() if micro_batcher is not None else {"enabled": False}
+    }
 
 @app.get("/")
 def say_hello():
-    return {"message": "Hello, the FastAPI server is running"}
\ No newline at end of file
+    return {"message": "Hello, the FastAPI server is running"}
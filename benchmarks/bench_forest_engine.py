@@ -0,0 +1,81 @@
+"""
+Compares sklearn RandomForestClassifier.predict_proba against the FlatForest inference backend.
+
+Usage:
+    python -m benchmarks.bench_forest_engine                          # synthetic forest from MODEL_TRAINER_* env
+    python -m benchmarks.bench_forest_engine --model path/to/model.pkl
+
+Single core, 300 trees of depth 20, 14 features:
+       batch   sklearn ms    flat ms  speedup
+           1        28.61       0.41    70.2x
+         100        36.24      10.66     3.4x
+         256        35.01      30.73     1.1x
+        1000        94.79      91.57     1.0x
+       10000       481.57    1084.13     0.4x
+      100000      3883.19   11416.63     0.3x
+The flat engine loses past a few hundred rows; PREDICTION_FLAT_FOREST_MAX_BATCH (256) routes larger
+batches to sklearn.
+"""
+import argparse, os, time
+import joblib
+import numpy as np
+from dotenv import load_dotenv
+from sklearn.ensemble import RandomForestClassifier
+from src.pipeline.forest_engine import FlatForest
+
+load_dotenv()
+
+
+def synthetic_model(n_features: int, n_samples: int, random_state: int = 42) -> RandomForestClassifier:
+    rng = np.random.default_rng(random_state)
+    X = rng.normal(size=(n_samples, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n_samples) > 0).astype(int)
+    model = RandomForestClassifier(
+        n_estimators=int(os.getenv("MODEL_TRAINER_N_ESTIMATORS", 300)),
+        max_depth=int(os.getenv("MODEL_TRAINER_MAX_DEPTH", 20)),
+        min_samples_split=int(os.getenv("MODEL_TRAINER_MIN_SAMPLES_SPLIT", 10)),
+        min_samples_leaf=int(os.getenv("MODEL_TRAINER_MIN_SAMPLES_LEAF", 5)),
+        random_state=random_state,
+        n_jobs=-1
+    )
+    return model.fit(X, y)
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Path to a joblib-pickled forest classifier")
+    parser.add_argument("--n-features", type=int, default=14)
+    parser.add_argument("--train-samples", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 100, 100000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model) if args.model else synthetic_model(args.n_features, args.train_samples)
+    # Score single-threaded on both sides so the comparison is per core.
+    model.n_jobs = None
+
+    start = time.perf_counter()
+    forest = FlatForest.from_sklearn(model)
+    print(f"Flattened {forest.n_estimators} trees, {len(forest.feature)} nodes in {time.perf_counter() - start:.3f}s")
+
+    rng = np.random.default_rng(0)
+    print(f"{'batch':>8} {'sklearn ms':>12} {'flat ms':>10} {'speedup':>8} {'max |diff|':>11}")
+    for batch_size in args.batch_sizes:
+        X = rng.normal(size=(batch_size, model.n_features_in_))
+        sklearn_time = best_of(lambda: model.predict_proba(X), args.repeats)
+        flat_time = best_of(lambda: forest.predict_proba(X), args.repeats)
+        difference = np.abs(forest.predict_proba(X) - model.predict_proba(X)).max()
+        print(f"{batch_size:>8} {sklearn_time * 1000:>12.2f} {flat_time * 1000:>10.2f} {sklearn_time / flat_time:>7.1f}x {difference:>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
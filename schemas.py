@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 
 class InsuranceInput(BaseModel):
     Age: int
@@ -16,3 +17,13 @@ class InsuranceInput(BaseModel):
 class PredictionResponse(BaseModel):
     prediction: int
     probability: float
+    threshold: float
+
+
+class BatchInsuranceInput(BaseModel):
+    records: List[InsuranceInput]
+    chunk_size: Optional[int] = Field(default=None, gt=0)
+
+
+class BatchPredictionResponse(BaseModel):
+    predictions: List[PredictionResponse]
@@ -0,0 +1,111 @@
+import os, sys
+from dotenv import load_dotenv
+from src.utils.logger import logging
+from src.utils.exception_handler import MyException
+from src.entity import DataIngestionArtifact, DataDriftArtifact
+from src.utils.common import read_yaml_file, write_yaml_file, iter_feature_batches
+from src.utils.drift_profile import ProfileBuilder
+from src.utils.s3_operations import S3Operations
+
+load_dotenv()
+
+class DataDrift:
+    """
+    Compares the new training set with the reference profile of the production model's training set.
+    The reference profile is uploaded to the registry by ModelPusher alongside the model.
+    """
+    def __init__(self, data_ingestion_artifact: DataIngestionArtifact):
+        self.artifacts_dir = os.getenv("DATA_ROOT_DIR")
+        self.date_dir = data_ingestion_artifact.date_dir
+        self.train_path = data_ingestion_artifact.train_file_path
+        self.schema = read_yaml_file(os.getenv("SCHEMA_FILE_PATH"))
+        self.model_name = os.getenv("MODEL_NAME")
+        self.reference_key = f"models/registry/{self.model_name}/production/{os.getenv('DATA_DRIFT_REFERENCE_FILE_NAME')}"
+
+        # The drift report sits next to the validation report.
+        self.data_drift_dir = os.path.join(
+            self.artifacts_dir,
+            self.date_dir,
+            os.getenv("DATA_VALIDATION_DIR_NAME")
+        )
+        self.report_file_path = os.path.join(self.data_drift_dir, os.getenv("DATA_DRIFT_REPORT_FILE_NAME"))
+        self.reference_file_path = os.path.join(self.data_drift_dir, os.getenv("DATA_DRIFT_REFERENCE_FILE_NAME"))
+
+        self.batch_size = int(os.getenv("DATA_VALIDATION_BATCH_SIZE", 100000))
+        self.bins = int(os.getenv("DATA_DRIFT_BINS", 10))
+        self.sample_size = int(os.getenv("DATA_DRIFT_SAMPLE_SIZE", 50000))
+        self.psi_threshold = float(os.getenv("DATA_DRIFT_PSI_THRESHOLD", 0.2))
+        self.ks_threshold = float(os.getenv("DATA_DRIFT_KS_THRESHOLD", 0.1))
+        logging.info("DataDrift class initialized successfully.")
+
+    def feature_columns(self) -> tuple:
+        """
+        Returns (numeric, categorical) schema columns to profile: everything but the drop columns and the target.
+        """
+        drop_columns = self.schema["drop_columns"]
+        drop_columns = [drop_columns] if isinstance(drop_columns, str) else list(drop_columns)
+        excluded = set(drop_columns) | {os.getenv("TARGET_COLUMN")}
+        numeric_columns = [column for column in self.schema["numerical_columns"] if column not in excluded]
+        categorical_columns = [column for column in self.schema["categorical_columns"] if column not in excluded]
+        return numeric_columns, categorical_columns
+
+    def load_reference_profile(self) -> dict:
+        """
+        Returns the production reference profile, or None if no model has been pushed with one yet.
+        """
+        s3 = S3Operations()
+        if not s3.file_exists(self.reference_key):
+            return None
+        return s3.load_metrics_from_s3(s3.bucket, self.reference_key)
+
+    def run(self) -> DataDriftArtifact:
+        try:
+            logging.info("Starting data drift detection...")
+            numeric_columns, categorical_columns = self.feature_columns()
+
+            reference = self.load_reference_profile()
+            builder = ProfileBuilder(
+                numeric_columns,
+                categorical_columns,
+                reference=reference,
+                bins=self.bins,
+                sample_size=self.sample_size
+            )
+            for batch in iter_feature_batches(self.train_path, self.batch_size, columns=numeric_columns + categorical_columns):
+                builder.update(batch)
+
+            write_yaml_file(self.reference_file_path, builder.profile(), replace=True)
+
+            if reference is None:
+                logging.info("No production reference profile found. Treating the data as drifted.")
+                features, drifted = {}, []
+                drift_detected = True
+            else:
+                features = builder.drift()
+                drifted = [
+                    column for column, stats in features.items()
+                    if stats["psi"] > self.psi_threshold or stats.get("ks", 0.0) > self.ks_threshold
+                ]
+                drift_detected = bool(drifted)
+
+            report = {
+                "drift_detected": drift_detected,
+                "reference_found": reference is not None,
+                "rows": builder.rows,
+                "psi_threshold": self.psi_threshold,
+                "ks_threshold": self.ks_threshold,
+                "drifted_columns": drifted,
+                "features": features
+            }
+            write_yaml_file(self.report_file_path, report, replace=True)
+            logging.info(f"Data drift report saved at {self.report_file_path}. Drifted columns: {drifted}")
+
+            return DataDriftArtifact(
+                drift_detected=drift_detected,
+                drifted_columns=drifted,
+                report_file_path=self.report_file_path,
+                reference_profile_file_path=self.reference_file_path
+            )
+        except Exception as e:
+            logging.error(f"Error in data drift detection: {e}")
+            raise MyException(e, sys)
@@ -1,8 +1,12 @@
-import os,sys, pymongo
+import os,sys, pymongo, time
+import numpy as np
 import pandas as pd
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.model_selection import train_test_split
 from dotenv import load_dotenv
-from src.utils.mongo_helper import connect_to_mongo
+from src.utils.mongo_helper import connect_to_mongo, mongo_pool_stats
+from src.utils.common import read_yaml_file, write_yaml_file, get_schema_dtypes, FeatureStoreWriter, read_feature_table
 from src.utils.logger import logging 
 from src.utils.exception_handler import MyException
 from datetime import datetime
@@ -11,38 +15,194 @@ from src.entity import DataIngestionArtifact
 load_dotenv()
 
 class DataIngestion:
-    def __init__(self):
+    def __init__(self, date_dir: str = None):
         """
         Initializes the DataIngestion class with database and directory configurations.
+        date_dir: run directory to write into, a new timestamped one when None
         """
         self.db_name = os.getenv("DATA_INGESTION_DB_NAME")
         self.collection_name = os.getenv("DATA_INGESTION_COLLECTION_NAME")
         self.artifacts_dir = os.getenv("DATA_ROOT_DIR")
-        self.date_dir = datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
+        self.date_dir = date_dir or datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
         self.data_ingestion_dir = os.path.join( self.artifacts_dir,self.date_dir,os.getenv("DATA_INGESTION_DIR_NAME"))
         self.feature_store_dir = os.path.join(self.data_ingestion_dir,os.getenv("DATA_INGESTION_FEATURE_STORE_DIR"))
         self.ingested_dir = os.path.join(self.data_ingestion_dir,os.getenv("DATA_INGESTION_INGESTED_DIR"))
         self.train_test_split_ratio = float(os.getenv("DATA_INGESTION_TRAIN_TEST_SPLIT_RATIO"))
+        self.batch_size = int(os.getenv("DATA_INGESTION_BATCH_SIZE", 50000))
+        self.partitions = int(os.getenv("DATA_INGESTION_PARTITIONS", 1))
+        self.partition_field = os.getenv("DATA_INGESTION_PARTITION_FIELD", "id")
+        self.split_method = os.getenv("DATA_INGESTION_SPLIT_METHOD", "range")
+        self.file_format = os.getenv("DATA_INGESTION_FILE_FORMAT", "parquet")
+        self.mode = os.getenv("DATA_INGESTION_MODE", "full")
+        self.watermark_field = os.getenv("DATA_INGESTION_WATERMARK_FIELD", "id")
+        self.id_column = os.getenv("DATA_INGESTION_ID_COLUMN", "id")
+        # Persistent, partitioned store shared by every incremental run (not under date_dir).
+        self.incremental_store_dir = os.path.join(self.artifacts_dir, os.getenv("DATA_INGESTION_INCREMENTAL_STORE_DIR", "incremental_store"), self.collection_name)
+        self.incremental_state_path = os.path.join(self.incremental_store_dir, "ingestion_state.yaml")
+        self.schema_dtypes = get_schema_dtypes(read_yaml_file(os.getenv("SCHEMA_FILE_PATH")))
         logging.info("DataIngestion class initialized successfully.")
 
+    def batch_to_frame(self, documents: list) -> pd.DataFrame:
+        """
+        Converts a batch of Mongo documents into a DataFrame column by column,
+        using the dtypes declared in the schema.
+        """
+        return pd.DataFrame({
+            column: pd.array([document.get(column) for document in documents], dtype=dtype)
+            for column, dtype in self.schema_dtypes.items()
+        })
+
+    def stream_to_feature_store(self, cursor, writer: FeatureStoreWriter, on_batch=None) -> int:
+        """
+        Appends the cursor to a feature store file in batches of DATA_INGESTION_BATCH_SIZE documents,
+        so memory stays bounded by the batch size. Returns the number of rows written.
+        on_batch: optional callable receiving each raw document batch
+        """
+        total_rows = 0
+        while True:
+            documents = list(islice(cursor, self.batch_size))
+            if not documents:
+                break
+            if on_batch is not None:
+                on_batch(documents)
+            writer.write(self.batch_to_frame(documents))
+            total_rows += len(documents)
+            logging.info(f"Exported {total_rows} documents to {writer.file_path} so far.")
+        return total_rows
+
+    def boundary_values(self, collection) -> list:
+        """
+        Returns the partition field's value at every 1/partitions-th document in field order, for fields
+        that cannot be interpolated (e.g. ObjectId _id), so the split points keep the field's type.
+        """
+        field = self.partition_field
+        count = collection.count_documents({field: {'$ne': None}})
+        boundaries = []
+        for index in range(1, self.partitions):
+            document = next(iter(
+                collection.find({field: {'$ne': None}}, {field: 1}).sort(field, pymongo.ASCENDING).skip(count * index // self.partitions).limit(1)
+            ), None)
+            if document is not None:
+                boundaries.append(document[field])
+        return boundaries
+
+    def compute_split_points(self, collection) -> list:
+        """
+        Returns partitions + 1 boundaries over the partition field. "range" splits [min, max]
+        evenly; "sample" takes quantiles of a $sample, which copes better with skewed ids.
+        Non-numeric fields such as ObjectId _id are split at sampled (or, for "range", counted)
+        document boundaries instead, so the split points stay comparable to the field.
+        """
+        field = self.partition_field
+        lowest = collection.find_one({field: {'$ne': None}}, {field: 1}, sort=[(field, pymongo.ASCENDING)])
+        highest = collection.find_one({field: {'$ne': None}}, {field: 1}, sort=[(field, pymongo.DESCENDING)])
+        if lowest is None:
+            return []
+        low, high = lowest[field], highest[field]
+        numeric = isinstance(low, (int, float, np.number)) and isinstance(high, (int, float, np.number))
+
+        if self.split_method == "sample":
+            sample_size = 1000 * self.partitions
+            values = [doc[field] for doc in collection.aggregate([
+                {'$match': {field: {'$ne': None}}},
+                {'$sample': {'size': sample_size}},
+                {'$project': {'_id': 0, field: 1}}
+            ])]
+            if numeric:
+                inner = np.quantile(values, np.linspace(0, 1, self.partitions + 1)[1:-1]).tolist()
+            else:
+                values.sort()
+                inner = [values[len(values) * index // self.partitions] for index in range(1, self.partitions)]
+        elif self.split_method == "range":
+            if numeric:
+                inner = np.linspace(low, high, self.partitions + 1)[1:-1].tolist()
+            else:
+                inner = self.boundary_values(collection)
+        else:
+            raise ValueError(f"Unknown DATA_INGESTION_SPLIT_METHOD: {self.split_method}")
+        return sorted(set([low, *inner, high]))
+
+    def export_partition(self, collection, projection: dict, index: int, query: dict, label: str) -> tuple:
+        """
+        Exports the documents matching query, ordered by the partition field, to its own part file.
+        """
+        field = self.partition_field
+        part_path = os.path.join(self.feature_store_dir, f"part-{index:05d}.{self.file_format}")
+        cursor = collection.find(query, dict(projection), batch_size=self.batch_size).sort(field, pymongo.ASCENDING)
+
+        start = time.perf_counter()
+        with FeatureStoreWriter(part_path, self.schema_dtypes) as writer:
+            rows = self.stream_to_feature_store(cursor, writer)
+        elapsed = time.perf_counter() - start
+        logging.info(
+            f"Partition {index} {label}: {rows} rows in {elapsed:.2f}s "
+            f"({rows / elapsed if elapsed else 0:.0f} rows/s)"
+        )
+        return part_path, rows
+
+    def partition_queries(self, collection) -> list:
+        """
+        Returns (query, label) per partition: lower <= field < upper ranges (<= upper for the last one),
+        plus a catch-all for documents whose partition field is null or missing, which no range matches.
+        """
+        field = self.partition_field
+        bounds = self.compute_split_points(collection)
+        ranges = list(zip(bounds[:-1], bounds[1:])) or ([(bounds[0], bounds[0])] if bounds else [])
+        queries = [
+            (
+                {field: {'$gte': lower, '$lte' if index == len(ranges) - 1 else '$lt': upper}},
+                f"[{lower}, {upper}{']' if index == len(ranges) - 1 else ')'}"
+            )
+            for index, (lower, upper) in enumerate(ranges)
+        ]
+        # {field: None} matches both null and missing fields.
+        queries.append(({field: None}, f"{field} null or missing"))
+        return queries
+
+    def export_partitioned(self, collection, projection: dict, writer: FeatureStoreWriter) -> int:
+        """
+        Reads partition ranges concurrently, each on its own pooled connection, and
+        concatenates the part files in partition order so the output is deterministic.
+        """
+        queries = self.partition_queries(collection)
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            futures = [
+                executor.submit(self.export_partition, collection, projection, index, query, label)
+                for index, (query, label) in enumerate(queries)
+            ]
+            parts = [future.result() for future in futures]
+
+        for part_path, _ in parts:
+            writer.append_file(part_path)
+            os.remove(part_path)
+        return sum(rows for _, rows in parts)
+
     def export_data_to_feature_store(self):
         """
-        Exports data from MongoDB to a feature store as a CSV file.
+        Exports the collection from MongoDB to a Parquet (or CSV) feature store file, either through a single
+        streaming cursor or, with DATA_INGESTION_PARTITIONS > 1, through parallel range-partitioned reads.
         """
         try:
             client = connect_to_mongo()
             db = client[self.db_name]
             collection = db[self.collection_name]
-            data = list(collection.find({},{'_id': 0}).limit(1000))
-            df = pd.DataFrame(data)
+            projection = {'_id': 0, **{column: 1 for column in self.schema_dtypes}}
 
             os.makedirs(self.artifacts_dir, exist_ok=True)
             os.makedirs(self.feature_store_dir, exist_ok=True)
 
-            feature_store_path = os.path.join(self.feature_store_dir, "data.csv")
-            df.to_csv(feature_store_path, index=False)
+            feature_store_path = os.path.join(self.feature_store_dir, f"data.{self.file_format}")
+
+            start = time.perf_counter()
+            with FeatureStoreWriter(feature_store_path, self.schema_dtypes) as writer:
+                if self.partitions > 1:
+                    total_rows = self.export_partitioned(collection, projection, writer)
+                else:
+                    cursor = collection.find({}, projection, batch_size=self.batch_size)
+                    total_rows = self.stream_to_feature_store(cursor, writer)
+            elapsed = time.perf_counter() - start
 
-            logging.info(f"Data exported to feature store at {feature_store_path}")
+            logging.info(f"Data exported to feature store at {feature_store_path} ({total_rows} rows in {elapsed:.2f}s)")
             return feature_store_path
         except Exception as e:
             logging.error(f"Error exporting data to feature store: {e}")
@@ -53,17 +213,18 @@ class DataIngestion:
         Splits the data from the feature store into training and testing datasets.
         """
         try:
-            df = pd.read_csv(feature_store_path)
+            df = read_feature_table(feature_store_path)
 
             train_df, test_df = train_test_split(df, test_size=self.train_test_split_ratio, random_state=42)
 
             os.makedirs(self.ingested_dir, exist_ok=True)
 
-            train_path = os.path.join(self.ingested_dir, "train.csv")
-            test_path = os.path.join(self.ingested_dir, "test.csv")
+            train_path = os.path.join(self.ingested_dir, f"train.{self.file_format}")
+            test_path = os.path.join(self.ingested_dir, f"test.{self.file_format}")
 
-            train_df.to_csv(train_path, index=False)
-            test_df.to_csv(test_path, index=False)
+            for path, split_df in ((train_path, train_df), (test_path, test_df)):
+                with FeatureStoreWriter(path, self.schema_dtypes) as writer:
+                    writer.write(split_df)
 
             logging.info(f"Data splitted into train and test sets at {train_path} and {test_path}")
             return train_path, test_path
@@ -71,11 +232,136 @@ class DataIngestion:
             logging.error(f"Error splitting data into train and test sets: {e}")
             raise MyException(e, sys)
 
+    def read_incremental_state(self) -> dict:
+        if os.path.exists(self.incremental_state_path):
+            return read_yaml_file(self.incremental_state_path)
+        return {"watermark_field": self.watermark_field, "high_water_mark": None, "runs": []}
+
+    def export_delta_to_incremental_store(self) -> dict:
+        """
+        Pulls only documents whose watermark field is above the stored high-water mark and appends
+        them to the persistent store as a new partition. Returns the updated (unsaved) state.
+
+        Updated documents are only picked up when the watermark field changes on every write (e.g. an
+        updated_at timestamp). With the default id watermark only newly inserted documents are pulled.
+        """
+        try:
+            state = self.read_incremental_state()
+            if state["watermark_field"] != self.watermark_field:
+                raise ValueError(
+                    f"Incremental store was built with watermark field {state['watermark_field']!r}, "
+                    f"not {self.watermark_field!r}. Use a new DATA_INGESTION_INCREMENTAL_STORE_DIR."
+                )
+            high_water_mark = state["high_water_mark"]
+
+            client = connect_to_mongo()
+            collection = client[self.db_name][self.collection_name]
+            field = self.watermark_field
+            query = {field: {'$gt': high_water_mark}} if high_water_mark is not None else {field: {'$ne': None}}
+            projection = {'_id': 0, field: 1, **{column: 1 for column in self.schema_dtypes}}
+            cursor = collection.find(query, projection, batch_size=self.batch_size).sort(field, pymongo.ASCENDING)
+
+            observed = {"max": high_water_mark}
+            def track_watermark(documents):
+                # The cursor is sorted on the watermark field, so the last document holds the batch maximum.
+                observed["max"] = documents[-1][field]
+
+            partition_path = os.path.join(self.incremental_store_dir, f"part-{self.date_dir}.{self.file_format}")
+            with FeatureStoreWriter(partition_path, self.schema_dtypes) as writer:
+                rows = self.stream_to_feature_store(cursor, writer, on_batch=track_watermark)
+            if rows == 0:
+                os.remove(partition_path)
+                logging.info(f"No documents above high-water mark {high_water_mark}.")
+            else:
+                logging.info(f"Pulled {rows} documents ({field} {high_water_mark} -> {observed['max']}) into {partition_path}")
+
+            state["high_water_mark"] = observed["max"]
+            state["runs"].append({
+                "date_dir": self.date_dir,
+                "rows": rows,
+                "previous_high_water_mark": high_water_mark,
+                "high_water_mark": observed["max"]
+            })
+            return state
+        except Exception as e:
+            logging.error(f"Error exporting delta to incremental store: {e}")
+            raise MyException(e, sys)
+
+    def is_test_row(self, ids: pd.Series) -> np.ndarray:
+        """
+        Deterministic split on a hash of the id, so a row keeps its train/test assignment across
+        runs and new rows never reshuffle existing ones. Integer ids are mixed directly; any other
+        ids (strings, ObjectIds, ...) are hashed by their string form.
+        """
+        integral = pd.api.types.is_numeric_dtype(ids) and not ids.isna().any() and bool((ids % 1 == 0).all())
+        if integral:
+            x = ids.to_numpy(dtype=np.int64).astype(np.uint64)
+        else:
+            x = pd.util.hash_pandas_object(ids.astype(str), index=False).to_numpy(dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            # splitmix64 finaliser
+            x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            x = x ^ (x >> np.uint64(31))
+        return (x % np.uint64(10000)) < np.uint64(round(self.train_test_split_ratio * 10000))
+
+    def split_incremental_store(self):
+        """
+        Rebuilds train and test sets from every partition of the incremental store. Documents pulled
+        again after an update appear in several partitions; the most recent version of each id wins.
+        Rows without an id are all kept and split on a hash of their content.
+        """
+        try:
+            partitions = sorted(
+                name for name in os.listdir(self.incremental_store_dir)
+                if name.startswith("part-") and name.endswith(f".{self.file_format}")
+            )
+            if not partitions:
+                raise ValueError(
+                    f"Incremental store {self.incremental_store_dir} is empty: collection "
+                    f"{self.db_name}.{self.collection_name} had no documents with {self.watermark_field} set"
+                )
+            df = pd.concat(
+                [read_feature_table(os.path.join(self.incremental_store_dir, name)) for name in partitions],
+                ignore_index=True
+            )
+            has_id = df[self.id_column].notna()
+            if not has_id.all():
+                logging.warning(f"{int((~has_id).sum())} rows of the incremental store have no {self.id_column}.")
+            df = pd.concat([df[has_id].drop_duplicates(subset=self.id_column, keep='last'), df[~has_id]], ignore_index=True)
+            missing = df[self.id_column].isna().to_numpy()
+            test_mask = np.empty(len(df), dtype=bool)
+            test_mask[~missing] = self.is_test_row(df[self.id_column][~missing])
+            if missing.any():
+                test_mask[missing] = self.is_test_row(pd.util.hash_pandas_object(df[missing], index=False))
+
+            os.makedirs(self.ingested_dir, exist_ok=True)
+            train_path = os.path.join(self.ingested_dir, f"train.{self.file_format}")
+            test_path = os.path.join(self.ingested_dir, f"test.{self.file_format}")
+            for path, split_df in ((train_path, df[~test_mask]), (test_path, df[test_mask])):
+                with FeatureStoreWriter(path, self.schema_dtypes) as writer:
+                    writer.write(split_df)
+
+            logging.info(f"Rebuilt train/test ({int((~test_mask).sum())}/{int(test_mask.sum())} rows) from {len(partitions)} partitions")
+            return train_path, test_path
+        except Exception as e:
+            logging.error(f"Error splitting incremental store: {e}")
+            raise MyException(e, sys)
+
     def run(self):
         try:
-            logging.info("Starting data ingestion process...")
-            feature_store_path = self.export_data_to_feature_store()
-            train_path, test_path = self.split_data_into_train_test(feature_store_path)
+            logging.info(f"Starting data ingestion process ({self.mode} mode)...")
+            if self.mode == "incremental":
+                state = self.export_delta_to_incremental_store()
+                train_path, test_path = self.split_incremental_store()
+                # Only advance the high-water mark once the run's splits exist.
+                write_yaml_file(self.incremental_state_path, state)
+            elif self.mode == "full":
+                feature_store_path = self.export_data_to_feature_store()
+                train_path, test_path = self.split_data_into_train_test(feature_store_path)
+            else:
+                raise ValueError(f"Unknown DATA_INGESTION_MODE: {self.mode}")
+            logging.info(f"Mongo connection pool: {mongo_pool_stats()}")
             logging.info("Data ingestion process completed successfully.")
             return DataIngestionArtifact(
                 date_dir=self.date_dir,
@@ -2,18 +2,22 @@ import os,sys, yaml
 from src.utils.exception_handler import MyException
 from src.utils.logger import logging
 from src.entity import DataIngestionArtifact, DataTransformationArtifact
-import pandas as pd
-from imblearn.combine import SMOTEENN
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from dotenv import load_dotenv
-from src.utils.common import read_yaml_file, write_yaml_file
+from src.utils.common import read_yaml_file, write_yaml_file, read_feature_table, save_numpy_array_data
+from src.utils.rebalancing import rebalance, RESAMPLING_STRATEGIES
+from src.utils.model_backends import load_model_config
+from src.utils.s3_operations import S3Operations
 import numpy as np
 import joblib
 
 load_dotenv()
 
+# Class labels are small non-negative integers.
+TARGET_DTYPE = np.int8
+
 class DataTransformation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact):
         """
@@ -24,6 +28,15 @@ class DataTransformation:
             self.target_column = os.getenv('TARGET_COLUMN')
             self.data_schema = read_yaml_file(os.getenv("SCHEMA_FILE_PATH"))
             self.artifacts_dir = os.getenv("DATA_ROOT_DIR")
+            self.memory_map = os.getenv("DATA_FEATURE_STORE_MEMORY_MAP", "false").lower() == "true"
+            self.rebalance_strategy = os.getenv("DATA_TRANSFORMATION_REBALANCE_STRATEGY", "smoteenn").lower()
+            self.enn_chunk_size = int(os.getenv("DATA_TRANSFORMATION_ENN_CHUNK_SIZE", 50000))
+            self.rebalance_n_jobs = int(os.getenv("DATA_TRANSFORMATION_REBALANCE_N_JOBS", 1))
+            self.dtype = np.dtype(os.getenv("DATA_TRANSFORMATION_DTYPE", "float32"))
+            self.warm_start = os.getenv("MODEL_TRAINER_WARM_START", "false").lower() == "true"
+            # HyperparameterSearch validates on rows that were not resampled, so keep them when it runs.
+            search_enabled = bool((load_model_config().get("search") or {}).get("enabled", False))
+            self.keep_raw_train = search_enabled and self.rebalance_strategy in RESAMPLING_STRATEGIES
         except Exception as e:
             raise MyException(e, sys)
 
@@ -48,58 +61,105 @@ class DataTransformation:
             logging.error(f"Error in creating preprocessing pipeline: {e}")
             raise MyException(e, sys)
 
+    def load_production_preprocessor(self) -> ColumnTransformer:
+        """
+        Returns the fitted preprocessor of the production model, or None if there is none yet.
+        Warm-started forests keep their existing trees, so new data must be encoded exactly as before.
+        """
+        s3 = S3Operations()
+        preprocessor_key = f"models/registry/{os.getenv('MODEL_NAME')}/production/preprocessor.pkl"
+        if not s3.file_exists(preprocessor_key):
+            return None
+        with open(s3.download_cached(preprocessor_key), 'rb') as f:
+            return joblib.load(f)
+
     def run(self) -> DataTransformationArtifact:
         try:
             logging.info("Starting data transformation process...")
-            train_df = pd.read_csv(self.data_ingestion_artifact.train_file_path)
-            test_df = pd.read_csv(self.data_ingestion_artifact.test_file_path)
+            columns = [list(col.keys())[0] for col in self.data_schema['columns']]
+            train_df = read_feature_table(self.data_ingestion_artifact.train_file_path, columns=columns, memory_map=self.memory_map)
+            test_df = read_feature_table(self.data_ingestion_artifact.test_file_path, columns=columns, memory_map=self.memory_map)
 
-            preprocessor = self.create_preprocessing_pipeline()
+            preprocessor = self.load_production_preprocessor() if self.warm_start else None
+            preprocessor_reused = preprocessor is not None
+            preprocessor = preprocessor or self.create_preprocessing_pipeline()
 
             X_train = train_df.drop(self.target_column, axis=1)
-            y_train = train_df[self.target_column]
+            y_train = train_df[self.target_column].to_numpy(dtype=TARGET_DTYPE)
             X_test = test_df.drop(self.target_column, axis=1)
-            y_test = test_df[self.target_column]
+            y_test = test_df[self.target_column].to_numpy(dtype=TARGET_DTYPE)
+            del train_df, test_df
 
             logging.info("Applying preprocessing transformations...")
-            X_train_transformed = preprocessor.fit_transform(X_train)
-            X_test_transformed = preprocessor.transform(X_test)
+            if preprocessor_reused:
+                logging.info("Reusing the production preprocessor for warm-started training.")
+                X_train_transformed = preprocessor.transform(X_train).astype(self.dtype, copy=False)
+            else:
+                X_train_transformed = preprocessor.fit_transform(X_train).astype(self.dtype, copy=False)
+            X_test_transformed = preprocessor.transform(X_test).astype(self.dtype, copy=False)
+            del X_train, X_test
             logging.info("Preprocessing transformations applied successfully.")
 
-            logging.info("Applying SMOTEENN to handle class imbalance...")
-            smote_enn = SMOTEENN(random_state=42)
-            X_train_resampled, y_train_resampled = smote_enn.fit_resample(X_train_transformed, y_train)
-            logging.info("SMOTEENN applied successfully.")
+            transformed_dir = os.path.join(self.artifacts_dir, self.data_ingestion_artifact.date_dir, os.getenv("DATA_TRANSFORMATION_DIR_NAME"))
+            transformed_data_dir = os.path.join(transformed_dir, os.getenv("DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR"))
+            raw_files = {}
+            if self.keep_raw_train:
+                raw_files = {
+                    name: os.path.join(transformed_data_dir, os.getenv(f"TRANSFORMED_{name.upper()}_FILE_NAME"))
+                    for name in ("train_raw_features", "train_raw_target")
+                }
+                save_numpy_array_data(raw_files["train_raw_features"], np.ascontiguousarray(X_train_transformed))
+                save_numpy_array_data(raw_files["train_raw_target"], y_train)
+
+            logging.info(f"Rebalancing classes with strategy {self.rebalance_strategy}...")
+            X_train_resampled, y_train_resampled, class_weight, rebalance_report = rebalance(
+                self.rebalance_strategy,
+                X_train_transformed,
+                y_train,
+                random_state=42,
+                enn_chunk_size=self.enn_chunk_size,
+                n_jobs=self.rebalance_n_jobs
+            )
+            logging.info(f"Rebalancing done: {rebalance_report}")
+
+            del X_train_transformed, y_train
 
-            train_array = np.c_[X_train_resampled, y_train_resampled]
-            test_array = np.c_[X_test_transformed, y_test]
-            
             logging.info("Saving transformed data and preprocessing object...")
-            transformed_dir = os.path.join(self.artifacts_dir, self.data_ingestion_artifact.date_dir, os.getenv("DATA_TRANSFORMATION_DIR_NAME"))
             os.makedirs(transformed_dir, exist_ok=True)
-            transformed_data_dir = os.path.join(transformed_dir, os.getenv("DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR"))
             os.makedirs(transformed_data_dir, exist_ok=True)
-            transformed_train_file_path = os.path.join(transformed_data_dir, os.getenv("TRANSFORMED_TRAIN_FILE_NAME"))
-            transformed_test_file_path = os.path.join(transformed_data_dir, os.getenv("TRANSFORMED_TEST_FILE_NAME"))
+            transformed_files = {
+                name: os.path.join(transformed_data_dir, os.getenv(f"TRANSFORMED_{name.upper()}_FILE_NAME"))
+                for name in ("train_features", "train_target", "test_features", "test_target")
+            }
 
             transformed_object = os.path.join(transformed_dir, os.getenv("DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR"))
             os.makedirs(transformed_object, exist_ok=True)
             preprocessed_object_file_path = os.path.join(transformed_object, os.getenv("PREPROCESSED_OBJECT_FILE_NAME"))
 
-            np.save(transformed_train_file_path, train_array)
-            np.save(transformed_test_file_path, test_array)
+            # Features and target are stored separately so training can memory-map them as-is.
+            save_numpy_array_data(transformed_files["train_features"], np.ascontiguousarray(X_train_resampled, dtype=self.dtype))
+            save_numpy_array_data(transformed_files["train_target"], np.asarray(y_train_resampled, dtype=TARGET_DTYPE))
+            save_numpy_array_data(transformed_files["test_features"], np.ascontiguousarray(X_test_transformed))
+            save_numpy_array_data(transformed_files["test_target"], y_test)
             with open(preprocessed_object_file_path, 'wb') as f:
                 joblib.dump(preprocessor, f)
             data = {
                 'transformed_columns': preprocessor.get_feature_names_out().tolist()
             }
             write_yaml_file(file_path=os.getenv('TRANSFORMED_COLUMNS_ORDERING_FILE_NAME'), content=data )
+            write_yaml_file(file_path=os.path.join(transformed_dir, os.getenv("DATA_TRANSFORMATION_REBALANCE_REPORT_FILE_NAME")), content=rebalance_report)
             logging.info("Transformed data and preprocessing object saved successfully.")
             logging.info("Data transformation process completed successfully.")
             return DataTransformationArtifact(
-                transformed_train_file_path=transformed_train_file_path,
-                transformed_test_file_path=transformed_test_file_path,
-                preprocessed_object_file_path=preprocessed_object_file_path
+                transformed_train_features_file_path=transformed_files["train_features"],
+                transformed_train_target_file_path=transformed_files["train_target"],
+                transformed_test_features_file_path=transformed_files["test_features"],
+                transformed_test_target_file_path=transformed_files["test_target"],
+                preprocessed_object_file_path=preprocessed_object_file_path,
+                class_weight=class_weight,
+                preprocessor_reused=preprocessor_reused,
+                transformed_train_raw_features_file_path=raw_files.get("train_raw_features"),
+                transformed_train_raw_target_file_path=raw_files.get("train_raw_target")
             )
         except Exception as e:
             logging.error(f"Error in data transformation process: {e}")
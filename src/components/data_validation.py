@@ -1,11 +1,13 @@
 import os, sys
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from src.utils.logger import logging 
 from src.utils.exception_handler import MyException
 from src.entity import DataIngestionArtifact, DataValidationArtifact
 import yaml
-from src.utils.common import read_yaml_file
+from src.utils.common import read_yaml_file, read_feature_columns, iter_feature_batches
+from src.utils.validation_engine import SchemaValidator
 
 class DataValidation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact):
@@ -25,6 +27,8 @@ class DataValidation:
             self.data_validation_dir,
             os.getenv("DATA_VALIDATION_REPORT_FILE_NAME")
         )
+        self.batch_size = int(os.getenv("DATA_VALIDATION_BATCH_SIZE", 100000))
+        self.statistics = {}
         logging.info("DataValidation class initialized successfully.")
 
     def check_column_count(self,df: pd.DataFrame, expected_column_count: int) -> bool:
@@ -56,15 +60,26 @@ class DataValidation:
             logging.error(f"Extra columns: {extra}")
             return False
 
+    def validate_contents(self, file_path: str, schema: dict) -> SchemaValidator:
+        """
+        Streams the file through the schema validator in DATA_VALIDATION_BATCH_SIZE chunks.
+        """
+        validator = SchemaValidator(schema)
+        for batch in iter_feature_batches(file_path, self.batch_size):
+            validator.update(batch)
+        return validator
+
     def run(self):
         try: 
             debug_message = ""
             validation_status = False
-            columns = read_yaml_file(os.getenv("SCHEMA_FILE_PATH"))['columns']
+            schema = read_yaml_file(os.getenv("SCHEMA_FILE_PATH"))
+            columns = schema['columns']
             allowed = [list(col.keys())[0] for col in columns]
             
-            train_df = pd.read_csv(self.train_path)
-            test_df = pd.read_csv(self.test_path)
+            # Only the column layout is checked here, so read the header/schema and no rows.
+            train_df = pd.DataFrame(columns=read_feature_columns(self.train_path))
+            test_df = pd.DataFrame(columns=read_feature_columns(self.test_path))
             
             logging.info("Validating training and testing data...")
             if not self.check_column_count(train_df, len(columns)):
@@ -82,6 +97,26 @@ class DataValidation:
             if not self.allowed_columns(test_df, allowed):
                 debug_message += "Testing data contains disallowed columns. "
                 raise MyException("Testing data contains disallowed columns.", sys)
+
+            logging.info("Validating data contents against the schema...")
+            errors = []
+            validators = {}
+            for split, path in (("train", self.train_path), ("test", self.test_path)):
+                validators[split] = self.validate_contents(path, schema)
+                split_errors, self.statistics[split] = validators[split].result()
+                errors += [f"{split} {error}" for error in split_errors]
+
+            if schema.get("id_column"):
+                overlap = len(np.intersect1d(validators["train"].ids(), validators["test"].ids(), assume_unique=True))
+                self.statistics["train_test_id_overlap"] = overlap
+                if overlap:
+                    errors.append(f"{overlap} ids appear in both train and test")
+
+            if errors:
+                for error in errors:
+                    logging.warning(f"Content validation failed: {error}")
+                debug_message += "; ".join(errors)
+                raise ValueError(f"Content validation failed with {len(errors)} errors.")
             validation_status = True
             logging.info("Data validation completed successfully.")
         except Exception as e:
@@ -90,7 +125,8 @@ class DataValidation:
             os.makedirs(self.data_validation_dir, exist_ok=True)
             report = {
                 "validation_status": validation_status,
-                "debug_message": debug_message
+                "debug_message": debug_message,
+                "statistics": self.statistics
             }
             with open(self.report_file_path, 'w') as report_file:
                 yaml.dump(report, report_file)
@@ -0,0 +1,196 @@
+import os, sys, time, multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from sklearn.metrics import get_scorer
+from threadpoolctl import threadpool_limits
+from sklearn.model_selection import ParameterSampler
+from src.entity import DataIngestionArtifact, DataTransformationArtifact, HyperparameterSearchArtifact
+from src.utils.common import write_yaml_file, save_numpy_array_data
+from src.utils.exception_handler import MyException
+from src.utils.logger import logging
+from src.utils.model_backends import MODEL_BACKENDS, load_model_config, get_model_backend
+from src.utils.rebalancing import rebalance, RESAMPLING_STRATEGIES
+
+load_dotenv()
+
+# Arrays opened once per worker process by _open_shared_arrays.
+_shared = {}
+
+
+def _open_shared_arrays(train_features_path: str, train_target_path: str, validation_features_path: str, validation_target_path: str):
+    """
+    Pool initializer: memory-maps the search arrays, so every worker reads the same page-cache copy
+    instead of receiving the data pickled with each trial.
+    """
+    _shared["X"] = np.load(train_features_path, mmap_mode="r")
+    _shared["y"] = np.load(train_target_path, mmap_mode="r")
+    _shared["validation"] = (np.load(validation_features_path, mmap_mode="r"), np.load(validation_target_path, mmap_mode="r"))
+
+
+def _run_trial(trial: dict) -> dict:
+    """
+    Fits one candidate on the first n_rows rows of the shuffled search training split and scores it
+    on the validation rows.
+    """
+    X, y = _shared["X"][:trial["n_rows"]], _shared["y"][:trial["n_rows"]]
+
+    backend = MODEL_BACKENDS[trial["backend"]]
+    model = backend.create(dict(trial["base_params"], **trial["params"]), **trial["fixed_params"])
+    # Backends without n_jobs (e.g. hist_gradient_boosting) use OpenMP on every core; cap each worker
+    # at its share so n_workers processes do not oversubscribe the CPU.
+    with threadpool_limits(limits=trial["fixed_params"]["n_jobs"]):
+        start = time.perf_counter()
+        model.fit(X, y)
+        fit_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        score = get_scorer(trial["scoring"])(model, *_shared["validation"])
+        score_seconds = time.perf_counter() - start
+    return {
+        "trial": trial["trial"],
+        "rung": trial["rung"],
+        "n_rows": int(len(y)),
+        "params": trial["params"],
+        "score": float(score),
+        "fit_seconds": round(fit_seconds, 3),
+        "score_seconds": round(score_seconds, 3)
+    }
+
+
+class HyperparameterSearch:
+    """
+    Randomized or successive-halving search over the param_space of the configured model backend
+    in config/model.yaml. Trials run in a process pool that shares the search arrays through memory maps.
+
+    Candidates are scored on a validation split of the training set taken before rebalancing, so
+    they are compared on real rows only. The rest of the split is rebalanced with the same strategy
+    as DataTransformation and used to fit the candidates.
+    """
+    def __init__(self, data_transformation_artifact: DataTransformationArtifact, data_ingestion_artifact: DataIngestionArtifact):
+        try:
+            self.data_transformation_artifact = data_transformation_artifact
+            self.data_ingestion_artifact = data_ingestion_artifact
+            self.model_config = load_model_config()
+            self.model_backend = get_model_backend(self.model_config)
+            self.config = self.model_config.get("search") or {}
+            self.enabled = bool(self.config.get("enabled", False))
+            self.search_dir = os.path.join(
+                os.getenv("DATA_ROOT_DIR"),
+                data_ingestion_artifact.date_dir,
+                os.getenv("MODEL_TRAINER_DIR_NAME")
+            )
+            self.results_file_path = os.path.join(self.search_dir, os.getenv("MODEL_SEARCH_RESULTS_FILE_NAME"))
+            self.rebalance_strategy = os.getenv("DATA_TRANSFORMATION_REBALANCE_STRATEGY", "smoteenn").lower()
+            self.enn_chunk_size = int(os.getenv("DATA_TRANSFORMATION_ENN_CHUNK_SIZE", 50000))
+            self.rebalance_n_jobs = int(os.getenv("DATA_TRANSFORMATION_REBALANCE_N_JOBS", 1))
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def run(self) -> HyperparameterSearchArtifact:
+        try:
+            logging.info("Starting hyperparameter search...")
+            artifact = self.data_transformation_artifact
+            if self.rebalance_strategy in RESAMPLING_STRATEGIES and artifact.transformed_train_raw_target_file_path == artifact.transformed_train_target_file_path:
+                raise ValueError(
+                    f"The transformed training set was resampled with {self.rebalance_strategy} and no copy before "
+                    "rebalancing was kept. Rerun DataTransformation with the search enabled in config/model.yaml."
+                )
+            X_raw = np.load(artifact.transformed_train_raw_features_file_path, mmap_mode="r")
+            y_raw = np.load(artifact.transformed_train_raw_target_file_path, mmap_mode="r")
+            random_state = int(self.config.get("random_state", 42))
+            factor = int(self.config.get("factor", 3))
+            n_workers = int(self.config.get("n_workers", os.cpu_count() or 1))
+
+            # Validation rows come from the data before rebalancing; only the search training rows are rebalanced.
+            rng = np.random.default_rng(random_state)
+            order = rng.permutation(len(y_raw))
+            n_validation = max(1, int(len(y_raw) * float(self.config.get("validation_fraction", 0.2))))
+            validation_index, train_index = np.sort(order[:n_validation]), np.sort(order[n_validation:])
+            X_train, y_train, class_weight, rebalance_report = rebalance(
+                self.rebalance_strategy,
+                X_raw[train_index],
+                y_raw[train_index],
+                random_state=random_state,
+                enn_chunk_size=self.enn_chunk_size,
+                n_jobs=self.rebalance_n_jobs
+            )
+            logging.info(f"Rebalanced the search training split: {rebalance_report}")
+            # Samplers append synthetic rows at the end; shuffle so every rung's prefix mixes them in.
+            shuffle = rng.permutation(len(y_train))
+            n_train = len(y_train)
+            search_files = {
+                name: os.path.join(self.search_dir, f"search_{name}.npy")
+                for name in ("train_features", "train_target", "validation_features", "validation_target")
+            }
+            save_numpy_array_data(search_files["train_features"], np.ascontiguousarray(X_train[shuffle]))
+            save_numpy_array_data(search_files["train_target"], np.asarray(y_train)[shuffle])
+            save_numpy_array_data(search_files["validation_features"], np.ascontiguousarray(X_raw[validation_index]))
+            save_numpy_array_data(search_files["validation_target"], np.asarray(y_raw[validation_index]))
+            del X_train, y_train, X_raw, y_raw
+
+            base_params = self.model_backend.default_params(self.model_config)
+            candidates = list(ParameterSampler(
+                self.model_backend.param_space(self.model_config),
+                n_iter=int(self.config.get("n_candidates", 20)),
+                random_state=random_state
+            ))
+            fixed_params = {
+                "class_weight": class_weight,
+                "random_state": random_state,
+                "n_jobs": max(1, (os.cpu_count() or 1) // n_workers)
+            }
+
+            method = self.config.get("method", "successive_halving")
+            if method not in ("successive_halving", "random"):
+                raise ValueError(f"Unknown search method: {method}")
+            # Random search scores every candidate on all search rows in a single rung.
+            n_rows = n_train if method == "random" else int(self.config.get("min_rows", 20000))
+            scoring = self.config.get("scoring", "f1")
+
+            trials = []
+            rung = 0
+            # forkserver: the pool is started from a pipeline thread while pymongo and boto3 threads run,
+            # and forking a process with running threads can deadlock the child.
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context("forkserver"),
+                initializer=_open_shared_arrays,
+                initargs=tuple(search_files.values())
+            ) as executor:
+                while True:
+                    n_rows = min(n_rows, n_train)
+                    logging.info(f"Search rung {rung}: {len(candidates)} candidates on {n_rows} rows.")
+                    batch = [
+                        {"trial": len(trials) + index, "rung": rung, "n_rows": n_rows, "backend": self.model_backend.name,
+                         "base_params": base_params, "params": params, "fixed_params": fixed_params, "scoring": scoring}
+                        for index, params in enumerate(candidates)
+                    ]
+                    results = sorted(executor.map(_run_trial, batch), key=lambda result: result["score"], reverse=True)
+                    trials.extend(sorted(results, key=lambda result: result["trial"]))
+
+                    # Keep the best 1/factor on factor times more rows, until one is left or all rows are used.
+                    candidates = [result["params"] for result in results[:max(1, len(results) // factor)]]
+                    if n_rows >= n_train or len(candidates) == 1:
+                        break
+                    n_rows *= factor
+                    rung += 1
+
+            best = results[0]
+            logging.info(f"Best {self.model_backend.name} hyperparameters: {best['params']} ({scoring}={best['score']:.4f})")
+            write_yaml_file(
+                self.results_file_path,
+                {"best_params": best["params"], "best_score": best["score"], "rebalance": rebalance_report, "trials": trials},
+                replace=True
+            )
+            for file_path in search_files.values():
+                os.remove(file_path)
+            return HyperparameterSearchArtifact(
+                best_params=best["params"],
+                best_score=best["score"],
+                trials=trials,
+                results_file_path=self.results_file_path
+            )
+        except Exception as e:
+            logging.error(f"Error during hyperparameter search: {e}")
+            raise MyException(e, sys)
@@ -20,6 +20,22 @@ class ModelEvaluation:
         self.metric_name = os.getenv("PRIMARY_METRIC")
         self.model_name = os.getenv("MODEL_NAME")
         self.production_metric_key = f"models/registry/{self.model_name}/production/metrics.yaml"
+        self.production_metrics = None
+        self._production_metrics_fetched = False
+
+    def fetch_production_metrics(self) -> dict:
+        """
+        Loads the production model's metrics, None when no model is in production yet.
+        Does not need the trained model, so TrainPipeline runs it while training is still going.
+        """
+        try:
+            if not self._production_metrics_fetched:
+                if self.s3.file_exists(self.production_metric_key):
+                    self.production_metrics = self.s3.load_metrics_from_s3(self.s3.bucket, self.production_metric_key)
+                self._production_metrics_fetched = True
+            return self.production_metrics
+        except Exception as e:
+            raise MyException(e, sys)
 
     def run(
         self,
@@ -35,7 +51,8 @@ class ModelEvaluation:
 
             logging.info(f"Current model {self.metric_name}: {current_score}")
 
-            if not self.s3.file_exists(self.production_metric_key):
+            prod_metrics = self.fetch_production_metrics()
+            if prod_metrics is None:
                 logging.info("No production model found. Accepting first model.")
 
                 return ModelEvaluationArtifact(
@@ -44,7 +61,6 @@ class ModelEvaluation:
                     best_model_metric=current_score
                 )
 
-            prod_metrics = self.s3.load_metrics_from_s3(self.s3.bucket, self.production_metric_key)
             prod_score = prod_metrics[self.metric_name]
 
             logging.info(f"Production model {self.metric_name}: {prod_score}")
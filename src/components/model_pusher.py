@@ -1,13 +1,17 @@
-import os,sys
+import os,sys, joblib
+from concurrent.futures import ThreadPoolExecutor
 from src.utils.exception_handler import MyException
 from src.utils.logger import logging
 from src.entity import (
     DataTransformationArtifact,
     ModelEvaluationArtifact,
     ModelPusherArtifact,
-    ModelTrainingArtifact
+    ModelTrainingArtifact,
+    DataDriftArtifact
 )
 from src.utils.s3_operations import S3Operations
+from src.utils.mmap_artifact import save_mmap_object
+from src.pipeline.forest_engine import FlatForest
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +20,7 @@ class ModelPusher:
     def __init__(self):
         self.s3 = S3Operations()
         self.model_name = os.getenv("MODEL_NAME")
+        self.upload_workers = int(os.getenv("MODEL_PUSHER_UPLOAD_WORKERS", 8))
 
     def _get_next_version(self) -> int:
         """
@@ -41,11 +46,40 @@ class ModelPusher:
         except Exception:
             return 1
 
+    def _export_mmap_artifacts(self, model_path: str, preprocessor_path: str) -> dict:
+        """
+        Converts the joblib pickles into the memory-mappable artifact format next to them.
+        Forest models also get their flattened inference arrays, verified against the model here so that
+        serving can load forest.mmap alone. Returns {registry file name: local path}.
+        """
+        model_dir = os.path.dirname(model_path)
+        artifacts = {
+            "model.mmap": os.path.join(model_dir, "model.mmap"),
+            "preprocessor.mmap": os.path.join(model_dir, "preprocessor.mmap")
+        }
+        with open(model_path, 'rb') as f:
+            model = joblib.load(f)
+        with open(preprocessor_path, 'rb') as f:
+            preprocessor = joblib.load(f)
+        save_mmap_object(artifacts["model.mmap"], model)
+        save_mmap_object(artifacts["preprocessor.mmap"], preprocessor)
+
+        try:
+            forest = FlatForest.from_sklearn(model)
+            if not forest.verify(model):
+                raise ValueError("flattened forest does not match the sklearn model")
+            save_mmap_object(os.path.join(model_dir, "forest.mmap"), forest)
+            artifacts["forest.mmap"] = os.path.join(model_dir, "forest.mmap")
+        except (TypeError, ValueError) as e:
+            logging.info(f"Skipping flattened forest artifact: {e}")
+        return artifacts
+
     def run(
         self,
         model_eval_artifact: ModelEvaluationArtifact,
         data_transform_artifact: DataTransformationArtifact,
-        model_trainer_artifact: ModelTrainingArtifact
+        model_trainer_artifact: ModelTrainingArtifact,
+        data_drift_artifact: DataDriftArtifact = None
     ) -> ModelPusherArtifact:
         try:
             if not model_eval_artifact.push_model:
@@ -58,35 +92,31 @@ class ModelPusher:
             version_path = f"models/registry/{self.model_name}/v{version}"
             production_path = f"models/registry/{self.model_name}/production"
 
-            # Upload model
-            self.s3.upload_file(
-                model_eval_artifact.trained_model_path,
-                f"{version_path}/model.pkl"
-            )
-            self.s3.upload_file(
+            artifacts = {
+                "model.pkl": model_eval_artifact.trained_model_path,
+                "preprocessor.pkl": data_transform_artifact.preprocessed_object_file_path,
+                "metrics.yaml": model_trainer_artifact.metrics_file_path
+            }
+            artifacts.update(self._export_mmap_artifacts(
                 model_eval_artifact.trained_model_path,
-                f"{production_path}/model.pkl"
-            )
-
-            # Upload preprocessor
-            self.s3.upload_file(
-                data_transform_artifact.preprocessed_object_file_path,
-                f"{version_path}/preprocessor.pkl"
-            )
-            self.s3.upload_file(
-                data_transform_artifact.preprocessed_object_file_path,
-                f"{production_path}/preprocessor.pkl"
-            )
-
-            # Upload metrics
-            self.s3.upload_file(
-                model_trainer_artifact.metrics_file_path,
-                f"{version_path}/metrics.yaml"
-            )
-            self.s3.upload_file(
-                model_trainer_artifact.metrics_file_path,
-                f"{production_path}/metrics.yaml"
-            )
+                data_transform_artifact.preprocessed_object_file_path
+            ))
+            if data_drift_artifact is not None:
+                # Reference profile of this model's training set, used by the next run's drift check.
+                artifacts[os.getenv("DATA_DRIFT_REFERENCE_FILE_NAME")] = data_drift_artifact.reference_profile_file_path
+
+            # Files within a step upload in parallel (boto3 clients are thread-safe). The version is complete
+            # before production is touched, and production's metrics.yaml, which evaluation compares
+            # against, is replaced last, so a failed push never leaves production with new metrics.
+            production_files = [file_name for file_name in artifacts if file_name != "metrics.yaml"]
+            steps = [
+                [(artifacts[file_name], f"{version_path}/{file_name}") for file_name in artifacts],
+                [(artifacts[file_name], f"{production_path}/{file_name}") for file_name in production_files],
+                [(artifacts["metrics.yaml"], f"{production_path}/metrics.yaml")]
+            ]
+            with ThreadPoolExecutor(max_workers=self.upload_workers) as executor:
+                for uploads in steps:
+                    list(executor.map(lambda upload: self.s3.upload_file(*upload), uploads))
 
             logging.info(
                 f"Model pushed successfully. Version: v{version} promoted to production."
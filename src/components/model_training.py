@@ -1,84 +1,172 @@
-from src.entity import DataTransformationArtifact, ModelTrainingArtifact, DataIngestionArtifact
+from src.entity import DataTransformationArtifact, ModelTrainingArtifact, DataIngestionArtifact, HyperparameterSearchArtifact
 from src.utils.common import write_yaml_file, load_numpy_array_data
 from src.utils.exception_handler import MyException
 from src.utils.logger import logging
-import sys, os, joblib
+from src.utils.s3_operations import S3Operations
+from src.utils.model_backends import load_model_config, get_model_backend
+import sys, os, time, joblib
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
 
+# MODEL_TRAINER_PARALLEL_BACKEND -> joblib backend. Tree building releases the GIL, so threads avoid
+# copying the data to workers; processes help when the GIL-bound parts dominate.
+PARALLEL_BACKENDS = {"threads": "threading", "processes": "loky"}
+
 class ModelTraining:
-    def __init__(self, data_transformation_artifact: DataTransformationArtifact, data_ingestion_artifact:DataIngestionArtifact):
+    def __init__(self, data_transformation_artifact: DataTransformationArtifact, data_ingestion_artifact:DataIngestionArtifact, hyperparameter_search_artifact: HyperparameterSearchArtifact = None):
         """ModelTraining class initialized successfully."""
         try:
             self.data_transformation_artifact = data_transformation_artifact
             self.data_ingestion_artifact = data_ingestion_artifact
+            self.hyperparameter_search_artifact = hyperparameter_search_artifact
             self.model_trainer_dir = os.getenv('MODEL_TRAINER_DIR_NAME')
             self.model_trainer_model_dir = os.getenv('MODEL_TRAINER_MODEL_DIR')
             self.model_trainer_model_name = os.getenv('MODEL_TRAINER_MODEL_FILE_NAME')
+            self.mmap_mode = os.getenv('MODEL_TRAINER_MMAP_MODE', 'r') or None
+            self.n_jobs = int(os.getenv('MODEL_TRAINER_N_JOBS', -1))
+            self.parallel_backend = os.getenv('MODEL_TRAINER_PARALLEL_BACKEND', 'threads').lower()
+            if self.parallel_backend not in PARALLEL_BACKENDS:
+                raise ValueError(f"Unknown MODEL_TRAINER_PARALLEL_BACKEND: {self.parallel_backend}")
+            self.model_config = load_model_config()
+            self.model_backend = get_model_backend(self.model_config)
+            self.warm_start = os.getenv('MODEL_TRAINER_WARM_START', 'false').lower() == 'true'
+            self.warm_start_n_estimators = int(os.getenv('MODEL_TRAINER_WARM_START_N_ESTIMATORS', 50))
+            self.warm_start_max_estimators = int(os.getenv('MODEL_TRAINER_WARM_START_MAX_ESTIMATORS', 1000))
         except Exception as e:
             raise MyException(e, sys)
 
     def create_model(self):
         """
-        Create and return a RandomForestClassifier model with hyperparameters from environment variables.
+        Create and return the configured backend's model with its default hyperparameters,
+        overridden by the best configuration of the hyperparameter search when one ran.
         """
-        model = RandomForestClassifier(
-            n_estimators = int(os.getenv('MODEL_TRAINER_N_ESTIMATORS')),
-            min_samples_split = int(os.getenv('MODEL_TRAINER_MIN_SAMPLES_SPLIT')),
-            min_samples_leaf = int(os.getenv('MODEL_TRAINER_MIN_SAMPLES_LEAF')),
-            max_depth = int(os.getenv('MODEL_TRAINER_MAX_DEPTH')),
-            criterion = os.getenv('MODEL_TRAINER_CRITERION'),
-            random_state = int(os.getenv('MODEL_TRAINER_RANDOM_STATE'))
+        params = self.model_backend.default_params(self.model_config)
+        if self.hyperparameter_search_artifact is not None:
+            params.update(self.hyperparameter_search_artifact.best_params)
+        model = self.model_backend.create(
+            params,
+            class_weight=self.data_transformation_artifact.class_weight,
+            random_state=int(os.getenv('MODEL_TRAINER_RANDOM_STATE')),
+            n_jobs=self.n_jobs
         )
         return model
 
+    def load_warm_start_model(self, n_features: int):
+        """
+        Returns the production forest set up to grow MODEL_TRAINER_WARM_START_N_ESTIMATORS more trees,
+        or None when a fresh model should be trained instead.
+
+        Warm starting is only valid while the data only grows and the production preprocessor was
+        reused by DataTransformation, so the existing trees see features on the same scale.
+        """
+        if not self.model_backend.supports_warm_start:
+            logging.info(f"Backend {self.model_backend.name} does not support warm start. Training a fresh model.")
+            return None
+        if not self.data_transformation_artifact.preprocessor_reused:
+            logging.info("Production preprocessor was not reused. Training a fresh forest.")
+            return None
+        model_key = f"models/registry/{os.getenv('MODEL_NAME')}/production/model.pkl"
+        with open(S3Operations().download_cached(model_key), 'rb') as model_file:
+            model = joblib.load(model_file)
+
+        if not isinstance(model, self.model_backend.estimator_class) or model.n_features_in_ != n_features:
+            logging.info("Production model is not a forest over the same features. Training a fresh forest.")
+            return None
+        n_estimators = len(model.estimators_) + self.warm_start_n_estimators
+        if n_estimators > self.warm_start_max_estimators:
+            logging.info(f"Warm start would grow the forest to {n_estimators} trees. Training a fresh forest.")
+            return None
+
+        logging.info(f"Warm starting from the production forest: {len(model.estimators_)} -> {n_estimators} trees.")
+        model.set_params(warm_start=True, n_estimators=n_estimators, n_jobs=self.n_jobs)
+        return model
+
     def run(self):
         """
         Trains the model using transformed training data and evaluates it on transformed test data.
         """
         try:
             logging.info("Model training started.")
-            transformed_train_path = self.data_transformation_artifact.transformed_train_file_path
-            transformed_test_path = self.data_transformation_artifact.transformed_test_file_path
+            timings = {}
+            start = time.perf_counter()
+            artifact = self.data_transformation_artifact
+            transformed_train_path = artifact.transformed_train_features_file_path
+            transformed_test_path = artifact.transformed_test_features_file_path
             logging.info(f"Loading transformed training & testing data from: {transformed_train_path} {transformed_test_path}")
-            
-            train_data = load_numpy_array_data(transformed_train_path)
-            test_data = load_numpy_array_data(transformed_test_path)
-            
-            X_train, y_train = train_data[:,:-1], train_data[:,-1]
-            X_test, y_test = test_data[:,:-1], test_data[:,-1]
 
-            logging.info(f"Training model using training data at: {transformed_train_path}")
-            model = self.create_model()
-            model.fit(X_train, y_train)
-            logging.info("Model training completed.")
+            # Memory-mapped float32 features are passed to the estimator without a copy.
+            X_train = load_numpy_array_data(transformed_train_path, mmap_mode=self.mmap_mode)
+            y_train = load_numpy_array_data(artifact.transformed_train_target_file_path)
+            X_test = load_numpy_array_data(transformed_test_path, mmap_mode=self.mmap_mode)
+            y_test = load_numpy_array_data(artifact.transformed_test_target_file_path)
+            timings["load_data"] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            model = self.load_warm_start_model(X_train.shape[1]) if self.warm_start else None
+            warm_started = model is not None
+            model = model or self.create_model()
+            timings["build_model"] = time.perf_counter() - start
+
+            logging.info(f"Training {self.model_backend.name} model using training data at: {transformed_train_path} ({self.parallel_backend}, n_jobs={self.n_jobs})")
+            start = time.perf_counter()
+            with joblib.parallel_config(backend=PARALLEL_BACKENDS[self.parallel_backend], n_jobs=self.n_jobs):
+                model.fit(X_train, y_train)
+            timings["fit"] = time.perf_counter() - start
+            logging.info(f"Model training completed in {timings['fit']:.2f}s.")
 
+            start = time.perf_counter()
             y_pred = model.predict(X_test)
             accuracy = accuracy_score(y_test, y_pred)
             f1 = f1_score(y_test, y_pred)
             precision = precision_score(y_test, y_pred)
             recall = recall_score(y_test, y_pred)
             
+            timings["evaluate"] = time.perf_counter() - start
             logging.info(f"Model evaluation metrics - Accuracy: {accuracy}, F1 Score: {f1}, Precision: {precision}, Recall: {recall}")
 
+            start = time.perf_counter()
+            # Saved forests predict without the warm start flag and with the serving default of n_jobs.
+            if self.model_backend.supports_warm_start:
+                model.set_params(warm_start=False)
+            if self.model_backend.supports_n_jobs:
+                model.set_params(n_jobs=None)
+
             model_dir = os.path.join(os.getenv('DATA_ROOT_DIR'), self.data_ingestion_artifact.date_dir, self.model_trainer_dir, self.model_trainer_model_dir)
             os.makedirs(model_dir, exist_ok=True)
             model_path = os.path.join(model_dir, self.model_trainer_model_name)
             logging.info(f"Saving trained model at: {model_path}")
             with open(model_path, 'wb') as model_file:
                 joblib.dump(model, model_file)
-            
+            timings["save_model"] = time.perf_counter() - start
+
             metrics = {
                 "Accuracy": accuracy,
                 "F1_Score": f1,
                 "Precision": precision,
-                "Recall": recall
+                "Recall": recall,
+                "training": {
+                    "model_backend": self.model_backend.name,
+                    # backend and n_estimators are kept for readers of the earlier metrics layout.
+                    "backend": self.parallel_backend,
+                    "parallel_backend": self.parallel_backend,
+                    "n_jobs": self.n_jobs,
+                    "n_estimators": self.model_backend.size(model),
+                    "size": self.model_backend.size(model),
+                    "warm_started": warm_started,
+                    "params": {name: model.get_params()[name] for name in self.model_backend.tracked_params(self.model_config)},
+                    "timings_seconds": {phase: round(seconds, 3) for phase, seconds in timings.items()}
+                }
             }
             metrics_file_path = os.path.join(os.getenv('DATA_ROOT_DIR'), self.data_ingestion_artifact.date_dir,self.model_trainer_dir, os.getenv("MODEL_TRAINER_MODEL_PERFORMANCE_FILE_NAME"))
             write_yaml_file(file_path=metrics_file_path, content=metrics)
             logging.info("Model saved successfully.")
-            return ModelTrainingArtifact(model_file_path=model_path,metrics_file_path=metrics_file_path)
+            search = self.hyperparameter_search_artifact
+            return ModelTrainingArtifact(
+                model_file_path=model_path,
+                metrics_file_path=metrics_file_path,
+                best_params=search.best_params if search else None,
+                search_trials=search.trials if search else None
+            )
         except Exception as e:
             logging.error(f"Error during model training: {e}")
             raise MyException(e, sys)
\ No newline at end of file
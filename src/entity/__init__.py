@@ -10,16 +10,50 @@ class DataValidationArtifact:
         self.debug_message = message
         self.report_file_path = report_file_path
 
+class DataDriftArtifact:
+    def __init__(self, drift_detected: bool, drifted_columns: list, report_file_path: str, reference_profile_file_path: str):
+        self.drift_detected = drift_detected
+        self.drifted_columns = drifted_columns
+        self.report_file_path = report_file_path
+        self.reference_profile_file_path = reference_profile_file_path
+
 class DataTransformationArtifact:
-    def __init__(self, transformed_train_file_path: str, transformed_test_file_path: str, preprocessed_object_file_path: str):
-        self.transformed_train_file_path = transformed_train_file_path
-        self.transformed_test_file_path = transformed_test_file_path
+    def __init__(
+        self,
+        transformed_train_features_file_path: str,
+        transformed_train_target_file_path: str,
+        transformed_test_features_file_path: str,
+        transformed_test_target_file_path: str,
+        preprocessed_object_file_path: str,
+        class_weight: str = None,
+        preprocessor_reused: bool = False,
+        transformed_train_raw_features_file_path: str = None,
+        transformed_train_raw_target_file_path: str = None
+    ):
+        self.transformed_train_features_file_path = transformed_train_features_file_path
+        self.transformed_train_target_file_path = transformed_train_target_file_path
+        self.transformed_test_features_file_path = transformed_test_features_file_path
+        self.transformed_test_target_file_path = transformed_test_target_file_path
         self.preprocessed_object_file_path = preprocessed_object_file_path
+        self.class_weight = class_weight
+        self.preprocessor_reused = preprocessor_reused
+        # Transformed training set before rebalancing, for scoring search candidates on real rows.
+        self.transformed_train_raw_features_file_path = transformed_train_raw_features_file_path or transformed_train_features_file_path
+        self.transformed_train_raw_target_file_path = transformed_train_raw_target_file_path or transformed_train_target_file_path
+
+class HyperparameterSearchArtifact:
+    def __init__(self, best_params: dict, best_score: float, trials: list, results_file_path: str):
+        self.best_params = best_params
+        self.best_score = best_score
+        self.trials = trials
+        self.results_file_path = results_file_path
 
 class ModelTrainingArtifact:
-    def __init__(self, model_file_path: str, metrics_file_path: str):
+    def __init__(self, model_file_path: str, metrics_file_path: str, best_params: dict = None, search_trials: list = None):
         self.model_file_path = model_file_path
         self.metrics_file_path = metrics_file_path
+        self.best_params = best_params
+        self.search_trials = search_trials
 
 
 class ModelEvaluationArtifact:
@@ -0,0 +1,136 @@
+"""
+Dependency-graph scheduler for TrainPipeline stages.
+
+Stages are started on a thread pool of PIPELINE_MAX_WORKERS as soon as the stages they depend on have
+finished, so independent work overlaps. Threads are enough: the heavy stages spend their time in
+NumPy/sklearn code, MongoDB or S3 calls that release the GIL, and hyperparameter search runs its
+own process pool. PIPELINE_MAX_WORKERS=1 runs the stages one after another in declaration order.
+
+Every stage's start and end (seconds from the start of the run) are recorded. The critical path is
+the chain of stages that gated the last one to finish, each picked as the dependency that ended
+last; shortening anything off that path does not shorten the run.
+"""
+import os, time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from dotenv import load_dotenv
+from src.utils.logger import logging
+
+load_dotenv()
+
+
+class StopPipeline(Exception):
+    """
+    Raised by a stage to end the run early without an error. Running stages finish, no new ones start.
+    """
+
+
+class Stage:
+    def __init__(self, name: str, run, depends_on: tuple = ()):
+        """
+        run → callable receiving {dependency name: its result} and returning this stage's result
+        depends_on → names of the stages that must finish first
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+
+
+class DAGExecutor:
+    def __init__(self, stages: list, max_workers: int = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.max_workers = max_workers or int(os.getenv("PIPELINE_MAX_WORKERS", 4))
+        self.timings = {}
+        self.stopped = None
+        self.wall_seconds = None
+        self._check_graph()
+
+    def _check_graph(self):
+        for stage in self.stages.values():
+            missing = [name for name in stage.depends_on if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {missing}")
+        # Kahn's algorithm: every stage must become ready at some point.
+        done = set()
+        while len(done) < len(self.stages):
+            ready = [name for name, stage in self.stages.items() if name not in done and set(stage.depends_on) <= done]
+            if not ready:
+                raise ValueError(f"Stage dependencies form a cycle among {sorted(set(self.stages) - done)}")
+            done.update(ready)
+
+    def _run_stage(self, stage: Stage, inputs: dict, origin: float):
+        start = time.perf_counter()
+        logging.info(f"Stage {stage.name} started.")
+        try:
+            return stage.run(inputs)
+        finally:
+            end = time.perf_counter()
+            self.timings[stage.name] = {
+                "start": round(start - origin, 3),
+                "end": round(end - origin, 3),
+                "seconds": round(end - start, 3)
+            }
+            logging.info(f"Stage {stage.name} finished in {end - start:.2f}s.")
+
+    def run(self) -> dict:
+        """
+        Runs every stage and returns {stage name: result}. Re-raises the first stage error after the
+        stages already running have finished; stages after a StopPipeline are left out of the result.
+        """
+        results = {}
+        pending = dict(self.stages)
+        running = {}
+        error = None
+        origin = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while True:
+                if error is None and self.stopped is None:
+                    # Only start what the pool can run now, so recorded start times are real start times.
+                    ready = [name for name, stage in pending.items() if all(dep in results for dep in stage.depends_on)]
+                    for name in ready[:self.max_workers - len(running)]:
+                        stage = pending.pop(name)
+                        inputs = {dep: results[dep] for dep in stage.depends_on}
+                        running[executor.submit(self._run_stage, stage, inputs, origin)] = name
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except StopPipeline as e:
+                        logging.info(f"Stage {name} stopped the pipeline: {e}")
+                        self.stopped = str(e)
+                    except Exception as e:
+                        logging.error(f"Stage {name} failed: {e}")
+                        error = error or e
+        self.wall_seconds = round(time.perf_counter() - origin, 3)
+        if error is not None:
+            raise error
+        return results
+
+    def critical_path(self) -> list:
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda stage: self.timings[stage]["end"])
+        path = [name]
+        while True:
+            dependencies = [dep for dep in self.stages[name].depends_on if dep in self.timings]
+            if not dependencies:
+                break
+            name = max(dependencies, key=lambda stage: self.timings[stage]["end"])
+            path.append(name)
+        return path[::-1]
+
+    def report(self) -> dict:
+        stage_seconds = sum(timing["seconds"] for timing in self.timings.values())
+        return {
+            "max_workers": self.max_workers,
+            "wall_seconds": self.wall_seconds,
+            "stage_seconds": round(stage_seconds, 3),
+            "stopped": self.stopped,
+            "stages": {
+                name: dict(timing, depends_on=list(self.stages[name].depends_on))
+                for name, timing in sorted(self.timings.items(), key=lambda item: item[1]["start"])
+            },
+            "critical_path": self.critical_path()
+        }
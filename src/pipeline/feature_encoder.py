@@ -0,0 +1,161 @@
+import os, threading
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder, FunctionTransformer
+from src.utils.common import read_yaml_file
+from src.utils.logger import logging
+
+
+class CompiledFeatureEncoder:
+    """
+    Maps a single raw input dict straight to a NumPy row, reproducing a fitted ColumnTransformer
+    (StandardScaler, MinMaxScaler, OneHotEncoder, drop, passthrough) without building a DataFrame.
+    """
+    def __init__(self, operations: list, feature_names: list):
+        self.operations = operations
+        self.feature_names = feature_names
+        self.n_features = len(feature_names)
+        self._local = threading.local()
+
+    @classmethod
+    def from_preprocessor(cls, preprocessor: ColumnTransformer, columns_file_path: str = None) -> "CompiledFeatureEncoder":
+        """
+        Compiles the fitted preprocessor into a flat list of per-column operations.
+        Output positions follow the column ordering recorded by DataTransformation.
+        """
+        feature_names = preprocessor.get_feature_names_out().tolist()
+        columns_file_path = columns_file_path or os.getenv("TRANSFORMED_COLUMNS_ORDERING_FILE_NAME")
+        if columns_file_path and os.path.exists(columns_file_path):
+            recorded = read_yaml_file(columns_file_path)["transformed_columns"]
+            if recorded != feature_names:
+                raise ValueError(f"Column ordering in {columns_file_path} does not match the fitted preprocessor")
+        position = {name: index for index, name in enumerate(feature_names)}
+
+        operations = []
+        for name, transformer, columns in preprocessor.transformers_:
+            if isinstance(transformer, str) and transformer == "drop":
+                continue
+            columns = cls._column_names(preprocessor, columns)
+
+            if (isinstance(transformer, str) and transformer == "passthrough") or (
+                isinstance(transformer, FunctionTransformer) and transformer.func is None
+            ):
+                for column in columns:
+                    operations.append(("passthrough", column, position[f"{name}__{column}"]))
+
+            elif isinstance(transformer, StandardScaler):
+                for i, column in enumerate(columns):
+                    mean = transformer.mean_[i] if transformer.with_mean else None
+                    scale = transformer.scale_[i] if transformer.with_std else None
+                    operations.append(("standard", column, position[f"{name}__{column}"], mean, scale))
+
+            elif isinstance(transformer, MinMaxScaler):
+                low, high = transformer.feature_range
+                for i, column in enumerate(columns):
+                    clip = (low, high) if transformer.clip else None
+                    operations.append(("minmax", column, position[f"{name}__{column}"], transformer.scale_[i], transformer.min_[i], clip))
+
+            elif isinstance(transformer, OneHotEncoder):
+                if transformer.drop is not None or getattr(transformer, "infrequent_categories_", None) is not None:
+                    raise ValueError("OneHotEncoder with drop or infrequent categories is not supported")
+                if transformer.handle_unknown not in ("ignore", "infrequent_if_exist"):
+                    raise ValueError(f"OneHotEncoder handle_unknown={transformer.handle_unknown!r} is not supported")
+                for i, column in enumerate(columns):
+                    slots = {
+                        category: position[f"{name}__{column}_{category}"]
+                        for category in transformer.categories_[i]
+                    }
+                    operations.append(("onehot", column, slots))
+
+            else:
+                raise ValueError(f"Unsupported transformer {name!r}: {type(transformer).__name__}")
+
+        return cls(operations, feature_names)
+
+    @staticmethod
+    def _column_names(preprocessor: ColumnTransformer, columns) -> list:
+        if isinstance(columns, str):
+            return [columns]
+        names = preprocessor.feature_names_in_
+        return [names[column] if isinstance(column, (int, np.integer)) else column for column in columns]
+
+    def _buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = np.zeros((1, self.n_features), dtype=np.float64)
+            self._local.buffer = buffer
+        return buffer
+
+    def encode(self, input_data: dict) -> np.ndarray:
+        """
+        input_data → raw form input dict
+        returns → (1, n_features) float64 row
+
+        The row is a per-thread buffer that is overwritten by the next call on the same thread.
+        """
+        row = self._buffer()
+        out = row[0]
+        for operation in self.operations:
+            kind, column = operation[0], operation[1]
+            value = input_data[column]
+            if kind == "onehot":
+                slots = operation[2]
+                for slot in slots.values():
+                    out[slot] = 0.0
+                slot = slots.get(value)
+                if slot is not None:
+                    out[slot] = 1.0
+            elif kind == "standard":
+                _, _, index, mean, scale = operation
+                value = float(value)
+                if mean is not None:
+                    value = value - mean
+                if scale is not None:
+                    value = value / scale
+                out[index] = value
+            elif kind == "minmax":
+                _, _, index, scale, minimum, clip = operation
+                value = float(value) * scale + minimum
+                if clip is not None:
+                    value = min(max(value, clip[0]), clip[1])
+                out[index] = value
+            else:
+                out[operation[2]] = float(value)
+        return row
+
+    def sample_records(self, n_records: int = 16) -> list:
+        """
+        Builds synthetic records that cover every known category and a spread of numeric values.
+        """
+        records = []
+        for i in range(n_records):
+            record = {}
+            for operation in self.operations:
+                kind, column = operation[0], operation[1]
+                if kind == "onehot":
+                    categories = list(operation[2])
+                    record[column] = categories[i % len(categories)]
+                elif kind == "standard":
+                    mean = operation[3] if operation[3] is not None else 0.0
+                    scale = operation[4] if operation[4] is not None else 1.0
+                    record[column] = int(round(mean + (i - n_records / 2) * scale / 4))
+                elif kind == "minmax":
+                    _, _, _, scale, minimum, _ = operation
+                    record[column] = (i / max(n_records - 1, 1) - minimum) / scale
+                else:
+                    record[column] = i
+            records.append(record)
+        return records
+
+    def verify(self, preprocessor: ColumnTransformer, records: list = None) -> bool:
+        """
+        Checks that encode() reproduces preprocessor.transform exactly for the given records.
+        """
+        records = records or self.sample_records()
+        expected = preprocessor.transform(pd.DataFrame(records))
+        for i, record in enumerate(records):
+            if not np.array_equal(self.encode(record)[0], expected[i]):
+                logging.warning(f"Compiled feature encoder mismatch on record {i}: {record}")
+                return False
+        return True
@@ -0,0 +1,166 @@
+import os, yaml
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from src.utils.logger import logging
+
+
+class FlatForest:
+    """
+    Inference-only copy of a fitted sklearn forest classifier with every tree flattened into
+    contiguous NumPy node arrays, so a whole batch is routed through all trees with vectorized indexing.
+
+    Leaves point to themselves with an infinite threshold, so each traversal step is the same
+    gather/compare/select for every (sample, tree) pair until the deepest tree is exhausted.
+    Children are interleaved as [right, left] so the next node is children[2 * node + go_left].
+
+    It only pays off on small batches. With 300 trees of depth 20 (benchmarks/bench_forest_engine.py)
+    it is ~70x faster than sklearn for one row, about even at 256 rows and about 0.4x sklearn's speed from
+    10k rows up, which is why PREDICTION_FLAT_FOREST_MAX_BATCH sends larger batches to sklearn.
+    """
+    ARRAY_NAMES = ("feature", "threshold", "children", "leaf_values", "roots", "classes_")
+
+    def __init__(self, feature, threshold, children, leaf_values, roots, classes, max_depth: int, n_features: int):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.leaf_values = leaf_values
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_estimators = len(roots)
+        self.n_features_in_ = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model) -> "FlatForest":
+        if not isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+            raise TypeError(f"FlatForest supports forest classifiers only, got {type(model).__name__}")
+        if model.n_outputs_ != 1:
+            raise ValueError("FlatForest supports single-output classifiers only")
+
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            left = np.where(is_leaf, node_ids, tree.children_left + offset).astype(np.int32)
+            right = np.where(is_leaf, node_ids, tree.children_right + offset).astype(np.int32)
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.int32)
+            threshold = np.where(is_leaf, np.inf, tree.threshold).astype(np.float64)
+
+            # Same normalisation as DecisionTreeClassifier.predict_proba.
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(left)
+            rights.append(right)
+            values.append(value / normalizer)
+            roots.append(offset)
+            offset += n_nodes
+
+        children = np.empty(2 * offset, dtype=np.int32)
+        children[0::2] = np.concatenate(rights)
+        children[1::2] = np.concatenate(lefts)
+
+        forest = cls(
+            feature=np.ascontiguousarray(np.concatenate(features)),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds)),
+            children=children,
+            leaf_values=np.ascontiguousarray(np.concatenate(values)),
+            roots=np.asarray(roots, dtype=np.int32),
+            classes=np.asarray(model.classes_),
+            max_depth=max(estimator.tree_.max_depth for estimator in model.estimators_),
+            n_features=model.n_features_in_
+        )
+        logging.info(f"Flattened {forest.n_estimators} trees into {offset} nodes (max depth {forest.max_depth}).")
+        return forest
+
+    def save(self, directory: str):
+        """
+        Writes each node array as an uncompressed .npy file plus a small metadata YAML,
+        so the forest can be memory-mapped by any number of processes.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in self.ARRAY_NAMES:
+            np.save(os.path.join(directory, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(directory, "forest.yaml"), "w") as file:
+            yaml.dump({"max_depth": self.max_depth, "n_features": self.n_features_in_}, file)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: str = "r") -> "FlatForest":
+        """
+        Opens a forest written by save(). With mmap_mode="r" the arrays are read-only views of the
+        files, so processes mapping the same directory share one copy through the OS page cache.
+        """
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in cls.ARRAY_NAMES}
+        with open(os.path.join(directory, "forest.yaml")) as file:
+            meta = yaml.safe_load(file)
+        return cls(
+            feature=arrays["feature"],
+            threshold=arrays["threshold"],
+            children=arrays["children"],
+            leaf_values=arrays["leaf_values"],
+            roots=arrays["roots"],
+            classes=np.asarray(arrays["classes_"]),
+            max_depth=meta["max_depth"],
+            n_features=meta["n_features"]
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the leaf node index reached in every tree, shape (n_samples, n_estimators).
+        """
+        # sklearn trees compare float32 inputs against float64 thresholds.
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat_X = X.ravel()
+        row_offsets = (np.arange(X.shape[0], dtype=np.int64) * X.shape[1])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_estimators)).copy()
+        for _ in range(self.max_depth):
+            go_left = flat_X.take(row_offsets + self.feature.take(nodes)) <= self.threshold.take(nodes)
+            nodes = self.children.take(2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X: np.ndarray, chunk_size: int = None) -> np.ndarray:
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected input of shape (n_samples, {self.n_features_in_}), got {X.shape}")
+        # Keep the (rows x trees) index matrices around 256k entries so each level stays cache-resident.
+        chunk_size = chunk_size or max(1, (1 << 18) // max(self.n_estimators, 1))
+        proba = np.empty((X.shape[0], len(self.classes_)), dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.apply(X[start:start + chunk_size])
+            proba[start:start + chunk_size] = self.leaf_values.take(leaves, axis=0).mean(axis=1)
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def sample_inputs(self, n_samples: int = 256, random_state: int = 0) -> np.ndarray:
+        """
+        Draws inputs around the forest's own split thresholds so both sides of most splits are exercised.
+        """
+        rng = np.random.default_rng(random_state)
+        X = np.zeros((n_samples, self.n_features_in_), dtype=np.float64)
+        internal = np.isfinite(self.threshold)
+        for f in range(self.n_features_in_):
+            thresholds = self.threshold[internal & (self.feature == f)]
+            if len(thresholds):
+                picks = rng.choice(thresholds, size=n_samples)
+                X[:, f] = picks + rng.choice([-1.0, 1.0], size=n_samples) * np.maximum(np.abs(picks), 1.0) * 1e-3
+        return X
+
+    def verify(self, model, X: np.ndarray = None, atol: float = 1e-9) -> bool:
+        """
+        Checks that predict_proba matches the sklearn model within atol.
+        """
+        X = self.sample_inputs() if X is None else X
+        difference = np.abs(self.predict_proba(X) - model.predict_proba(X)).max()
+        if difference > atol:
+            logging.warning(f"FlatForest probabilities differ from sklearn by {difference}")
+            return False
+        return True
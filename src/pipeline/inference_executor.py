@@ -0,0 +1,106 @@
+import os, asyncio, time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import contextmanager
+from dotenv import load_dotenv
+from src.utils.logger import logging
+
+load_dotenv()
+
+
+class ExecutorSaturatedError(Exception):
+    """
+    Raised when every worker is busy and the wait queue is full.
+    """
+
+
+class BoundedInferenceExecutor:
+    """
+    Runs CPU-bound inference off the event loop on a dedicated thread or process pool.
+    At most max_workers + max_queue_size calls are admitted at once; further calls fail fast
+    with ExecutorSaturatedError instead of queueing until clients time out.
+
+    Admission bookkeeping happens on the event loop thread only, so no locking is needed.
+    """
+    def __init__(self, kind: str = None, max_workers: int = None, max_queue_size: int = None, initializer=None):
+        self.kind = (kind or os.getenv("PREDICTION_EXECUTOR_KIND", "thread")).lower()
+        if self.kind not in ("thread", "process"):
+            raise ValueError(f"Unknown PREDICTION_EXECUTOR_KIND: {self.kind}")
+        self.max_workers = max_workers or int(os.getenv("PREDICTION_EXECUTOR_MAX_WORKERS", os.cpu_count() or 1))
+        self.max_queue_size = max_queue_size if max_queue_size is not None else int(os.getenv("PREDICTION_EXECUTOR_MAX_QUEUE", 64))
+        self.capacity = self.max_workers + self.max_queue_size
+        self.initializer = initializer
+        self._executor = self._create_executor()
+
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_latency = 0.0
+
+    def _create_executor(self):
+        if self.kind == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+
+    def restart(self):
+        """
+        Swaps in a fresh pool; calls already running on the old pool are allowed to finish.
+        Needed in process mode so workers drop their cached model after a reload.
+        """
+        old_executor = self._executor
+        self._executor = self._create_executor()
+        old_executor.shutdown(wait=False)
+        logging.info(f"Inference {self.kind} pool restarted with {self.max_workers} workers.")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+    @contextmanager
+    def _slot(self):
+        if self._in_flight >= self.capacity:
+            self._rejected += 1
+            raise ExecutorSaturatedError(f"Inference executor saturated ({self._in_flight}/{self.capacity} in flight)")
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        start = time.perf_counter()
+        try:
+            yield
+            self._completed += 1
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._total_latency += time.perf_counter() - start
+
+    async def run(self, fn, *args):
+        """
+        Runs fn(*args) on the pool. In process mode fn and args must be picklable.
+        """
+        with self._slot():
+            return await asyncio.wrap_future(self._executor.submit(fn, *args))
+
+    async def wait(self, schedule, *args):
+        """
+        Calls schedule(*args), which hands work to another scheduler (e.g. MicroBatcher.submit) and
+        returns a concurrent.futures.Future, and awaits it under the same admission limit.
+        The slot is taken before schedule is called, so rejected calls are never scheduled.
+        """
+        with self._slot():
+            return await asyncio.wrap_future(schedule(*args))
+
+    def stats(self) -> dict:
+        finished = self._completed + self._failed
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "queued": max(self._in_flight - self.max_workers, 0),
+            "peak_in_flight": self._peak_in_flight,
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "mean_latency_ms": self._total_latency / finished * 1000 if finished else 0.0
+        }
@@ -0,0 +1,133 @@
+import os, queue, threading, time
+from collections import Counter
+from concurrent.futures import Future
+from dotenv import load_dotenv
+from src.utils.logger import logging
+from src.pipeline.inference_executor import ExecutorSaturatedError
+
+load_dotenv()
+
+_STOP = object()
+
+class MicroBatcher:
+    """
+    Collects concurrent single-record prediction requests for up to max_wait_ms or max_batch_size rows,
+    scores them with one PredictionPipeline.predict_batch call and fans the results back out.
+    At most max_queue_size records wait for a batch; submit raises ExecutorSaturatedError beyond that.
+    """
+    def __init__(self, pipeline_provider, max_batch_size: int = None, max_wait_ms: float = None, max_queue_size: int = None):
+        """
+        pipeline_provider → callable returning the PredictionPipeline to use for each batch,
+        so hot-swapped models are picked up without restarting the batcher.
+        """
+        self.pipeline_provider = pipeline_provider
+        self.max_batch_size = max_batch_size or int(os.getenv("PREDICTION_MICRO_BATCH_MAX_SIZE", 64))
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else float(os.getenv("PREDICTION_MICRO_BATCH_MAX_WAIT_MS", 5))) / 1000
+        self.max_queue_size = max_queue_size or int(os.getenv("PREDICTION_MICRO_BATCH_MAX_QUEUE", 256))
+        # One extra slot so the stop signal always fits.
+        self._queue = queue.Queue(maxsize=self.max_queue_size + 1)
+        self._stopping = False
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._rejected = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._thread.start()
+            logging.info(f"Micro-batcher started (max_batch_size={self.max_batch_size}, max_wait_ms={self.max_wait * 1000}).")
+
+    def stop(self):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            logging.info("Micro-batcher stopped.")
+
+    def submit(self, record: dict) -> Future:
+        """
+        Queues a raw form input dict and returns a Future resolving to its prediction dict.
+        Raises ExecutorSaturatedError when max_queue_size records are already waiting.
+        """
+        future = Future()
+        if self._queue.qsize() >= self.max_queue_size:
+            with self._stats_lock:
+                self._rejected += 1
+            raise ExecutorSaturatedError(f"Micro-batch queue full ({self.max_queue_size} records waiting)")
+        self._queue.put_nowait((record, future))
+        return future
+
+    def predict(self, record: dict) -> dict:
+        return self.submit(record).result()
+
+    def _collect(self, first) -> list:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Finish the current batch, then let the run loop stop.
+                self._stopping = True
+                break
+            batch.append(item)
+        return batch
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            batch = self._collect(item)
+            records = [record for record, _ in batch]
+            try:
+                results = self.pipeline_provider().predict_batch(records, chunk_size=len(records))
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                logging.error(f"Micro-batch of {len(batch)} records failed: {e}")
+                with self._stats_lock:
+                    self._errors += 1
+                for _, future in batch:
+                    future.set_exception(e)
+            with self._stats_lock:
+                self._batches += 1
+                self._rows += len(batch)
+                self._batch_sizes[self._bucket(len(batch))] += 1
+            if self._stopping:
+                return
+
+    @staticmethod
+    def _bucket(size: int) -> str:
+        """
+        Power-of-two histogram bucket label for a batch size, e.g. 1, 2, 3-4, 5-8.
+        """
+        if size <= 2:
+            return str(size)
+        upper = 1 << (size - 1).bit_length()
+        return f"{upper // 2 + 1}-{upper}"
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_size": self.max_queue_size,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self._batches,
+                "rows": self._rows,
+                "errors": self._errors,
+                "rejected": self._rejected,
+                "mean_batch_size": self._rows / self._batches if self._batches else 0.0,
+                "batch_size_histogram": dict(sorted(self._batch_sizes.items(), key=lambda kv: int(kv[0].split("-")[0])))
+            }
@@ -0,0 +1,124 @@
+import os, threading, time
+from dotenv import load_dotenv
+from src.utils.logger import logging
+from src.pipeline.prediction import PredictionPipeline
+from src.pipeline.shared_model_store import SharedModelStore, publish_from_registry
+
+load_dotenv()
+
+class ModelRegistryCache:
+    """
+    Process-wide cache of loaded PredictionPipeline objects keyed by (model_name, version).
+    Models are pulled from S3 once and then served from memory until invalidated or reloaded.
+
+    When PREDICTION_SHARED_MODEL_DIR is set, pipelines are opened from the shared model store instead,
+    and the store's CURRENT pointer is checked every PREDICTION_SHARED_MODEL_POLL_SECONDS so every
+    worker process follows a newly published release.
+    """
+    def __init__(self):
+        self._pipelines = {}
+        self._last_checked = {}
+        self._lock = threading.Lock()
+        self.poll_seconds = float(os.getenv("PREDICTION_SHARED_MODEL_POLL_SECONDS", 5))
+
+    def _key(self, model_name: str = None, version: str = None) -> tuple:
+        return (
+            model_name or os.getenv("MODEL_NAME"),
+            version or os.getenv("MODEL_VERSION", "production")
+        )
+
+    def get(self, model_name: str = None, version: str = None) -> PredictionPipeline:
+        """
+        Returns the cached pipeline for the given model, loading it from S3 on first use.
+        """
+        key = self._key(model_name, version)
+        pipeline = self._pipelines.get(key)
+        if pipeline is not None:
+            if pipeline.use_shared_store and self._due_for_check(key):
+                pipeline = self._follow_shared_release(key, pipeline)
+            return pipeline
+
+        with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is None:
+                logging.info(f"Loading model {key[0]}:{key[1]} into registry cache.")
+                pipeline = PredictionPipeline(model_name=key[0], version=key[1])
+                self._pipelines[key] = pipeline
+        return pipeline
+
+    def _due_for_check(self, key: tuple) -> bool:
+        now = time.monotonic()
+        if now - self._last_checked.get(key, 0.0) < self.poll_seconds:
+            return False
+        self._last_checked[key] = now
+        return True
+
+    def _follow_shared_release(self, key: tuple, pipeline: PredictionPipeline) -> PredictionPipeline:
+        current = SharedModelStore().current_release(*key)
+        if current is None or current == pipeline.release_id:
+            return pipeline
+        logging.info(f"Shared release for {key[0]}:{key[1]} moved to {current}. Swapping.")
+        try:
+            return self._swap(key)
+        except Exception as e:
+            logging.error(f"Failed to open shared release {current}, keeping {pipeline.release_id}: {e}")
+            return pipeline
+
+    def _swap(self, key: tuple) -> PredictionPipeline:
+        pipeline = PredictionPipeline(model_name=key[0], version=key[1])
+        with self._lock:
+            self._pipelines[key] = pipeline
+        return pipeline
+
+    def reload(self, model_name: str = None, version: str = None) -> PredictionPipeline:
+        """
+        Loads a fresh copy of the model and swaps it in atomically.
+        Requests already holding the previous pipeline finish on it; new requests get the new one.
+        In shared-store mode the registry model is first published as a new release, which the
+        other worker processes then pick up on their next poll.
+        """
+        key = self._key(model_name, version)
+        if SharedModelStore.enabled():
+            publish_from_registry(*key)
+        logging.info(f"Reloading model {key[0]}:{key[1]}.")
+        pipeline = self._swap(key)
+        logging.info(f"Model {key[0]}:{key[1]} hot-swapped in registry cache.")
+        return pipeline
+
+    def invalidate(self, model_name: str = None, version: str = None) -> bool:
+        """
+        Drops a cached model so the next request loads it again. Returns False if it was not cached.
+        """
+        key = self._key(model_name, version)
+        with self._lock:
+            removed = self._pipelines.pop(key, None) is not None
+        logging.info(f"Invalidated model {key[0]}:{key[1]} in registry cache: {removed}")
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._pipelines.clear()
+
+    def loaded_models(self) -> list:
+        return [{"model_name": name, "version": version} for name, version in self._pipelines]
+
+
+model_registry = ModelRegistryCache()
+
+
+def warm_up():
+    """
+    Pool initializer: loads the default model into this process's cache.
+    """
+    try:
+        model_registry.get()
+    except Exception as e:
+        logging.error(f"Failed to warm up model registry cache: {e}")
+
+
+def predict_record(record: dict) -> dict:
+    return model_registry.get().predict(record)
+
+
+def predict_records(records: list, chunk_size: int = None) -> list:
+    return model_registry.get().predict_batch(records, chunk_size=chunk_size)
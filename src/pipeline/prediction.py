@@ -1,8 +1,12 @@
 import os, joblib
-import boto3
 import pandas as pd
-from io import BytesIO
 from dotenv import load_dotenv
+from src.pipeline.feature_encoder import CompiledFeatureEncoder
+from src.pipeline.forest_engine import FlatForest
+from src.pipeline.shared_model_store import SharedModelStore
+from src.utils.mmap_artifact import load_mmap_object
+from src.utils.s3_operations import S3Operations
+from src.utils.logger import logging
 
 load_dotenv()
 
@@ -10,41 +14,119 @@ class PredictionPipeline:
     """
     PredictionPipeline class for making predictions using a pre-trained model stored in S3.
     """
-    def __init__(self):
+    def __init__(self, model_name: str = None, version: str = None, decision_threshold: float = None, use_shared_store: bool = None):
         self.bucket = os.getenv("AWS_S3_BUCKET_NAME")
-        self.model_name = os.getenv("MODEL_NAME")
-        self.s3 = boto3.client("s3")
+        self.model_name = model_name or os.getenv("MODEL_NAME")
+        self.version = version or os.getenv("MODEL_VERSION", "production")
+
+        self.base_key = f"models/registry/{self.model_name}/{self.version}"
+
+        self.artifact_format = os.getenv("PREDICTION_ARTIFACT_FORMAT", "pickle").lower()
+
+        self.use_shared_store = SharedModelStore.enabled() if use_shared_store is None else use_shared_store
+        self.s3 = None if self.use_shared_store else S3Operations()
+        self.release_id = None
+        if self.use_shared_store:
+            # Memory-mapped flattened forest shared with the other worker processes
+            # (the unpickled model for non-forest backends).
+            self.release_id, self.model, self.preprocessor = SharedModelStore().open(self.model_name, self.version)
+        elif self.artifact_format == "mmap":
+            self.preprocessor = load_mmap_object(self._download_artifact("preprocessor.mmap"))
+            # The flat backend only needs the published forest; the sklearn model is loaded for large batches.
+            self.model = self._load_published_forest() or load_mmap_object(self._download_artifact("model.mmap"))
+        elif self.artifact_format == "pickle":
+            self.model = self._load_model()
+            self.preprocessor = self._load_preprocessor()
+        else:
+            raise ValueError(f"Unknown PREDICTION_ARTIFACT_FORMAT: {self.artifact_format}")
+
+        self.decision_threshold = decision_threshold if decision_threshold is not None else float(os.getenv("PREDICTION_DECISION_THRESHOLD", 0.5))
+        self.positive_class_index = list(self.model.classes_).index(1)
+        self.encoder = self._compile_encoder()
+        self.flat_forest_max_batch = int(os.getenv("PREDICTION_FLAT_FOREST_MAX_BATCH", 256))
+        if self.use_shared_store or isinstance(self.model, FlatForest):
+            self.flat_forest = self.model if isinstance(self.model, FlatForest) else None
+        else:
+            self.flat_forest = self._build_flat_forest()
+        # Workers serving a published forest load the sklearn model for large batches on first use.
+        self._batch_model = None if self.flat_forest is self.model else self.model
 
-        self.base_key = f"models/registry/{self.model_name}/production"
+    def _load_model(self):
+        with open(self._download_artifact("model.pkl"), "rb") as file:
+            return joblib.load(file)
 
-        self.model = self._load_model()
-        self.preprocessor = self._load_preprocessor()
+    def _load_preprocessor(self):
+        with open(self._download_artifact("preprocessor.pkl"), "rb") as file:
+            return joblib.load(file)
 
-    def _load_model(self):
+    def _download_artifact(self, file_name: str) -> str:
+        """
+        Returns a local path for a registry artifact through the S3 artifact cache, which only
+        downloads when the object's ETag has changed since the last load.
+        """
         if not self.bucket or not self.model_name:
             raise ValueError("AWS_S3_BUCKET_NAME or MODEL_NAME is not set")
-
-        key = f"{self.base_key}/model.pkl"
-
         try:
-            obj = self.s3.get_object(Bucket=self.bucket, Key=key)
-            body = obj["Body"].read()
+            return self.s3.download_cached(f"{self.base_key}/{file_name}")
+        except Exception as e:
+            raise RuntimeError(f"Failed to load {file_name} from S3: {str(e)}")
 
-            if body is None:
-                raise ValueError("S3 returned empty model file")
+    def _compile_encoder(self):
+        """
+        Builds the DataFrame-free single-record encoder and verifies it against the preprocessor.
+        Falls back to the preprocessor path if it cannot be compiled or does not match exactly.
+        """
+        if os.getenv("PREDICTION_FAST_PATH_ENABLED", "true").lower() != "true":
+            return None
+        try:
+            encoder = CompiledFeatureEncoder.from_preprocessor(self.preprocessor)
+            if not encoder.verify(self.preprocessor):
+                logging.warning("Compiled feature encoder failed verification. Using preprocessor.transform.")
+                return None
+            logging.info("Compiled feature encoder verified against preprocessor.")
+            return encoder
+        except Exception as e:
+            logging.warning(f"Could not compile feature encoder, using preprocessor.transform: {e}")
+            return None
 
-            return joblib.load(BytesIO(body))
+    def _flat_backend(self) -> bool:
+        backend = os.getenv("PREDICTION_INFERENCE_BACKEND", "sklearn").lower()
+        if backend not in ("sklearn", "flat"):
+            raise ValueError(f"Unknown PREDICTION_INFERENCE_BACKEND: {backend}")
+        return backend == "flat"
 
+    def _load_published_forest(self):
+        """
+        With the flat backend, returns the forest.mmap published next to model.mmap (verified against
+        the model by ModelPusher), or None when there is none.
+        """
+        if not self._flat_backend():
+            return None
+        try:
+            forest = load_mmap_object(self._download_artifact("forest.mmap"))
+            logging.info("Using the published FlatForest inference backend.")
+            return forest
         except Exception as e:
-            raise RuntimeError(f"Failed to load model from S3: {str(e)}")
-
+            logging.info(f"No published forest.mmap, flattening the model instead: {e}")
+            return None
 
-    def _load_preprocessor(self):
-        obj = self.s3.get_object(
-            Bucket=self.bucket,
-            Key=f"{self.base_key}/preprocessor.pkl"
-        )
-        return joblib.load(BytesIO(obj["Body"].read()))
+    def _build_flat_forest(self):
+        """
+        With PREDICTION_INFERENCE_BACKEND=flat the forest is flattened into NumPy node arrays,
+        as long as it matches sklearn's probabilities on a probe batch. Returns None otherwise.
+        """
+        if not self._flat_backend():
+            return None
+        try:
+            forest = FlatForest.from_sklearn(self.model)
+            if not forest.verify(self.model):
+                logging.warning("FlatForest failed verification. Using the sklearn model.")
+                return None
+            logging.info("Using FlatForest inference backend.")
+            return forest
+        except Exception as e:
+            logging.warning(f"Could not flatten model, using the sklearn model: {e}")
+            return None
 
     def predict(self, input_data: dict) -> dict:
         """
@@ -52,14 +134,74 @@ class PredictionPipeline:
         returns → prediction + probability
         """
 
-        df = pd.DataFrame([input_data])
-
-        transformed_data = self.preprocessor.transform(df)
+        if self.encoder is not None:
+            transformed_data = self.encoder.encode(input_data)
+        else:
+            transformed_data = self.preprocessor.transform(pd.DataFrame([input_data]))
 
-        prediction = int(self.model.predict(transformed_data)[0])
-        probability = float(self.model.predict_proba(transformed_data)[0][1])
+        predictions, probabilities = self._score(transformed_data)
 
         return {
-            "prediction": prediction,
-            "probability": probability
+            "prediction": int(predictions[0]),
+            "probability": float(probabilities[0]),
+            "threshold": self.decision_threshold
         }
+
+    def _score(self, transformed_data):
+        """
+        Runs a single predict_proba pass and derives the class from the positive-class probability.
+        A record is predicted positive when its probability is above the decision threshold,
+        which at 0.5 matches the model's own predict.
+
+        The flattened forest wins on small batches; past PREDICTION_FLAT_FOREST_MAX_BATCH rows sklearn's
+        compiled tree traversal is faster, so large batches go to the sklearn model.
+        """
+        if self.flat_forest is not None and transformed_data.shape[0] <= self.flat_forest_max_batch:
+            inference_model = self.flat_forest
+        else:
+            inference_model = self._large_batch_model()
+        probabilities = inference_model.predict_proba(transformed_data)[:, self.positive_class_index]
+        predictions = (probabilities > self.decision_threshold).astype(int)
+        return predictions, probabilities
+
+    def _large_batch_model(self):
+        """
+        The sklearn model. When serving a published forest it is loaded (unpickled from the shared-store
+        release, or mapped from model.mmap) the first time this worker scores a large batch; releases
+        published without it keep using the flattened forest.
+        """
+        if self._batch_model is None:
+            if self.use_shared_store:
+                model = SharedModelStore().load_model(self.model_name, self.version, self.release_id)
+                if model is None:
+                    logging.warning(f"Release {self.release_id} has no model.pkl. Scoring large batches with the flattened forest.")
+            else:
+                model = load_mmap_object(self._download_artifact("model.mmap"))
+            if model is not None:
+                logging.info(f"Loaded the sklearn model of {self.model_name}/{self.version} for large batches.")
+            self._batch_model = model or self.flat_forest
+        return self._batch_model
+
+    def predict_batch(self, records: list, chunk_size: int = None) -> list:
+        """
+        records → list of raw form input dicts
+        returns → list of prediction + probability dicts, in input order
+
+        Each chunk goes through the preprocessor and the model in a single vectorized call.
+        """
+        chunk_size = chunk_size or int(os.getenv("PREDICTION_BATCH_CHUNK_SIZE", 10000))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer")
+
+        results = []
+        for start in range(0, len(records), chunk_size):
+            df = pd.DataFrame(records[start:start + chunk_size])
+            transformed_data = self.preprocessor.transform(df)
+
+            predictions, probabilities = self._score(transformed_data)
+
+            results.extend(
+                {"prediction": int(prediction), "probability": float(probability), "threshold": self.decision_threshold}
+                for prediction, probability in zip(predictions, probabilities)
+            )
+        return results
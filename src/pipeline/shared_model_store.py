@@ -0,0 +1,159 @@
+"""
+Local model store that lets several API worker processes share one copy of the model weights.
+
+A release is the production model flattened into FlatForest .npy arrays plus the pickled
+preprocessor, written once under PREDICTION_SHARED_MODEL_DIR. Workers open the arrays with
+np.load(mmap_mode="r"), so the kernel keeps a single copy in the page cache no matter how many
+workers map it, instead of each worker unpickling its own forest.
+
+The sklearn model is published pickled next to the arrays. The flattened forest only beats
+sklearn on small batches, so a worker that gets a batch larger than PREDICTION_FLAT_FOREST_MAX_BATCH
+unpickles its own copy of the sklearn model on first use. Workers that only serve single
+records and small batches never load it.
+
+Layout:
+    <PREDICTION_SHARED_MODEL_DIR>/<model_name>/<version>/
+        CURRENT                      release id currently served
+        releases/<release_id>/       forest arrays, forest.yaml, model.pkl, preprocessor.pkl
+                                     (no forest arrays for non-forest backends)
+
+Rolling out a new model version to all workers:
+    1. Promote the model to the registry (ModelPusher does this at the end of TrainPipeline).
+    2. Run `python -m src.pipeline.shared_model_store publish` on the host, or call POST /model/reload
+       on any one worker. Either writes a new release and atomically repoints CURRENT.
+    3. Every worker checks CURRENT at most every PREDICTION_SHARED_MODEL_POLL_SECONDS and swaps to
+       the new release between requests. In-flight requests finish on the release they started with.
+"""
+import os, sys, shutil, argparse
+from datetime import datetime
+import joblib
+from dotenv import load_dotenv
+from src.pipeline.forest_engine import FlatForest
+from src.utils.exception_handler import MyException
+from src.utils.logger import logging
+
+load_dotenv()
+
+
+class SharedModelStore:
+    def __init__(self, root_dir: str = None, keep_releases: int = None):
+        self.root_dir = root_dir or os.getenv("PREDICTION_SHARED_MODEL_DIR")
+        if not self.root_dir:
+            raise ValueError("PREDICTION_SHARED_MODEL_DIR environment variable not set")
+        self.keep_releases = keep_releases or int(os.getenv("PREDICTION_SHARED_MODEL_KEEP_RELEASES", 2))
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(os.getenv("PREDICTION_SHARED_MODEL_DIR"))
+
+    def _model_dir(self, model_name: str, version: str) -> str:
+        return os.path.join(self.root_dir, model_name, version)
+
+    def _pointer_path(self, model_name: str, version: str) -> str:
+        return os.path.join(self._model_dir(model_name, version), "CURRENT")
+
+    def release_dir(self, model_name: str, version: str, release_id: str) -> str:
+        return os.path.join(self._model_dir(model_name, version), "releases", release_id)
+
+    def current_release(self, model_name: str, version: str) -> str:
+        """
+        Returns the release id currently served, or None if nothing has been published.
+        """
+        try:
+            with open(self._pointer_path(model_name, version)) as file:
+                return file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def publish(self, model, preprocessor, model_name: str, version: str) -> str:
+        """
+        Flattens the model into a new release and atomically points CURRENT at it. Models that are
+        not forests (e.g. hist_gradient_boosting) are only stored pickled and loaded whole by each worker.
+        """
+        try:
+            try:
+                forest = FlatForest.from_sklearn(model)
+            except (TypeError, ValueError) as e:
+                logging.info(f"Publishing the pickled model instead of a flattened forest: {e}")
+                forest = None
+            if forest is not None and not forest.verify(model):
+                raise ValueError("Flattened forest does not match the sklearn model")
+
+            release_id = datetime.now().strftime("%Y_%m_%d_%H_%M_%S_%f")
+            release_dir = self.release_dir(model_name, version, release_id)
+            os.makedirs(release_dir, exist_ok=True)
+            if forest is not None:
+                forest.save(release_dir)
+            with open(os.path.join(release_dir, "model.pkl"), "wb") as file:
+                joblib.dump(model, file)
+            with open(os.path.join(release_dir, "preprocessor.pkl"), "wb") as file:
+                joblib.dump(preprocessor, file)
+
+            pointer_path = self._pointer_path(model_name, version)
+            with open(f"{pointer_path}.tmp", "w") as file:
+                file.write(release_id)
+            os.replace(f"{pointer_path}.tmp", pointer_path)
+            logging.info(f"Published shared model release {model_name}:{version}:{release_id} to {release_dir}")
+
+            self._prune(model_name, version, keep=release_id)
+            return release_id
+        except Exception as e:
+            raise MyException(e, sys)
+
+    def _prune(self, model_name: str, version: str, keep: str):
+        """
+        Removes old releases. Workers still mapping them keep their pages until they unmap.
+        """
+        releases_dir = os.path.join(self._model_dir(model_name, version), "releases")
+        releases = sorted(os.listdir(releases_dir))
+        for release_id in releases[:-self.keep_releases]:
+            if release_id != keep:
+                shutil.rmtree(os.path.join(releases_dir, release_id), ignore_errors=True)
+
+    def open(self, model_name: str, version: str):
+        """
+        Memory-maps the current release. Returns (release_id, forest, preprocessor); forest is the
+        unpickled model for releases of non-forest backends.
+        """
+        release_id = self.current_release(model_name, version)
+        if release_id is None:
+            raise FileNotFoundError(f"No shared model release published for {model_name}:{version} in {self.root_dir}")
+        release_dir = self.release_dir(model_name, version, release_id)
+        if os.path.exists(os.path.join(release_dir, "forest.yaml")):
+            forest = FlatForest.load(release_dir, mmap_mode="r")
+        else:
+            forest = self.load_model(model_name, version, release_id)
+        with open(os.path.join(release_dir, "preprocessor.pkl"), "rb") as file:
+            preprocessor = joblib.load(file)
+        logging.info(f"Opened shared model release {model_name}:{version}:{release_id}")
+        return release_id, forest, preprocessor
+
+
+    def load_model(self, model_name: str, version: str, release_id: str):
+        """
+        Unpickles the sklearn model of a release, or returns None for releases published without it.
+        """
+        model_path = os.path.join(self.release_dir(model_name, version, release_id), "model.pkl")
+        if not os.path.exists(model_path):
+            return None
+        with open(model_path, "rb") as file:
+            return joblib.load(file)
+
+
+def publish_from_registry(model_name: str = None, version: str = None) -> str:
+    """
+    Loads the model from the S3 registry and publishes it as a new shared release.
+    """
+    from src.pipeline.prediction import PredictionPipeline
+
+    pipeline = PredictionPipeline(model_name=model_name, version=version, use_shared_store=False)
+    return SharedModelStore().publish(pipeline.model, pipeline.preprocessor, pipeline.model_name, pipeline.version)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish the registry model to the shared local model store.")
+    parser.add_argument("command", choices=["publish"])
+    parser.add_argument("--model-name", default=None)
+    parser.add_argument("--version", default=None)
+    args = parser.parse_args()
+    print(publish_from_registry(args.model_name, args.version))
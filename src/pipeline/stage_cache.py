@@ -0,0 +1,237 @@
+"""
+Content-addressed cache of TrainPipeline stage artifacts.
+
+Each stage gets a key that hashes everything its output depends on:
+    - the source of the stage's component module and every src module it imports, directly or not
+    - the env variables with the stage's prefixes
+    - config files it reads (schema.yaml, model.yaml)
+    - its input artifacts, where every attribute that is a file path is hashed by content
+
+If an entry with that key exists and its output files are still on disk, the stored artifact is
+returned instead of running the stage again. Keys do not include the run's date_dir, so a run whose
+ingested data hashes the same as an earlier run's reuses that run's reports, transformed arrays and
+model. Reused output files are hard-linked (copied across file systems) into the same place under the
+current run's date_dir and the returned artifact points there, so every run directory is complete and
+later stages never write into the earlier run.
+
+Stages that read external state (MongoDB for ingestion, the production registry for drift) pass
+resume_only=True. Their key then includes the date_dir, so they are only reused when the same run
+is resumed with `python -m src.pipeline.training --resume <date_dir>`.
+
+Layout:
+    <DATA_ROOT_DIR>/<PIPELINE_STAGE_CACHE_DIR>/<stage>/<key>.pkl   {"date_dir", "artifact", "outputs"}
+    <DATA_ROOT_DIR>/<date_dir>/<PIPELINE_STATE_FILE_NAME>          per-stage status, key and seconds,
+                                                                    plus the run's schedule
+"""
+import os, sys, ast, copy, time, json, shutil, hashlib, threading
+import importlib.util
+import joblib
+from dotenv import load_dotenv
+from src.utils.common import read_yaml_file, write_yaml_file
+from src.utils.exception_handler import MyException
+from src.utils.logger import logging
+
+load_dotenv()
+
+# Ingestion date_dir is where outputs are written, not an input of later stages.
+IGNORED_ARTIFACT_FIELDS = ("date_dir",)
+
+
+def file_digest(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_closure(module_name: str, package: str = "src") -> list:
+    """
+    Returns the source files of module_name and of every module of package it imports, directly or
+    through other modules, including imports inside functions. Found by parsing, not importing.
+    """
+    files, seen, queue = [], set(), [module_name]
+    while queue:
+        name = queue.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        spec = importlib.util.find_spec(name)
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            continue
+        files.append(spec.origin)
+        is_package = spec.submodule_search_locations is not None
+        with open(spec.origin) as file:
+            tree = ast.parse(file.read(), filename=spec.origin)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                imported = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom):
+                if node.level:
+                    # Relative import: resolve against this module's package.
+                    parent = name if is_package else name.rpartition(".")[0]
+                    for _ in range(node.level - 1):
+                        parent = parent.rpartition(".")[0]
+                    base = f"{parent}.{node.module}" if node.module else parent
+                else:
+                    base = node.module
+                # `from package import name` may name a submodule.
+                imported = [base] + [f"{base}.{alias.name}" for alias in node.names]
+            else:
+                continue
+            for candidate in imported:
+                if candidate == package or candidate.startswith(f"{package}."):
+                    try:
+                        if importlib.util.find_spec(candidate) is not None:
+                            queue.append(candidate)
+                    except ModuleNotFoundError:
+                        continue
+    return sorted(files)
+
+
+class StageCache:
+    def __init__(self, date_dir: str, enabled: bool = None):
+        self.date_dir = date_dir
+        self.data_root_dir = os.getenv("DATA_ROOT_DIR")
+        if not self.data_root_dir:
+            raise ValueError("DATA_ROOT_DIR is not set; it is the directory holding run outputs and the stage cache")
+        self.enabled = enabled if enabled is not None else os.getenv("PIPELINE_STAGE_CACHE_ENABLED", "true").lower() == "true"
+        self.cache_dir = os.path.join(self.data_root_dir, os.getenv("PIPELINE_STAGE_CACHE_DIR", "stage_cache"))
+        self.state_file_path = os.path.join(self.data_root_dir, date_dir, os.getenv("PIPELINE_STATE_FILE_NAME", "pipeline_state.yaml"))
+        self.state = read_yaml_file(self.state_file_path) if os.path.exists(self.state_file_path) else {"date_dir": date_dir, "stages": {}}
+        # Digests of files already hashed in this run, keyed by (path, size, mtime).
+        self._digests = {}
+        # Stages may run concurrently and all record into the same state file.
+        self._state_lock = threading.Lock()
+
+    def _file_fingerprint(self, file_path: str) -> str:
+        stat = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if memo_key not in self._digests:
+            self._digests[memo_key] = file_digest(file_path)
+        return self._digests[memo_key]
+
+    def _artifact_fingerprint(self, artifact) -> dict:
+        if artifact is None:
+            return None
+        fields = {}
+        for name, value in sorted(vars(artifact).items()):
+            if name in IGNORED_ARTIFACT_FIELDS:
+                continue
+            if isinstance(value, str) and os.path.isfile(value):
+                fields[name] = self._file_fingerprint(value)
+            else:
+                fields[name] = value
+        return {"class": type(artifact).__name__, "fields": fields}
+
+    def stage_key(self, component, inputs: dict = None, env_prefixes: tuple = (), config_files: tuple = (), resume_only: bool = False) -> str:
+        """
+        component → the stage's component class; its module's source closure is part of the key
+        inputs → {name: input artifact or None}
+        env_prefixes → env variables starting with any of these are part of the key
+        config_files → env variables holding config file paths hashed by content
+        """
+        parts = {
+            "code": {
+                os.path.relpath(file_path): self._file_fingerprint(file_path)
+                for file_path in source_closure(component.__module__)
+            },
+            "env": {name: value for name, value in sorted(os.environ.items()) if name.startswith(tuple(env_prefixes))},
+            "config": {name: self._file_fingerprint(os.getenv(name)) for name in config_files},
+            "inputs": {name: self._artifact_fingerprint(artifact) for name, artifact in sorted((inputs or {}).items())},
+            "date_dir": self.date_dir if resume_only else None
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True, default=repr).encode()).hexdigest()
+
+    def _entry_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.pkl")
+
+    def load(self, stage: str, key: str):
+        """
+        Returns the cached artifact, or None when there is no entry or its output files changed.
+        """
+        entry_path = self._entry_path(stage, key)
+        if not self.enabled or not os.path.exists(entry_path):
+            return None
+        with open(entry_path, "rb") as file:
+            entry = joblib.load(file)
+        for file_path, size in entry["outputs"].items():
+            if not os.path.isfile(file_path) or os.path.getsize(file_path) != size:
+                logging.info(f"Cached {stage} output {file_path} is missing or changed. Running the stage again.")
+                return None
+        return entry
+
+    def save(self, stage: str, key: str, artifact):
+        outputs = {
+            value: os.path.getsize(value)
+            for value in vars(artifact).values()
+            if isinstance(value, str) and os.path.isfile(value)
+        }
+        entry_path = self._entry_path(stage, key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        with open(f"{entry_path}.tmp", "wb") as file:
+            joblib.dump({"date_dir": self.date_dir, "artifact": artifact, "outputs": outputs}, file)
+        os.replace(f"{entry_path}.tmp", entry_path)
+
+    def _link_into_run(self, entry: dict):
+        """
+        Returns the cached artifact with every output file of the earlier run linked into this run's
+        date_dir at the same relative path. Files outside the earlier run's directory are left as is.
+        """
+        if entry["date_dir"] == self.date_dir:
+            return entry["artifact"]
+        source_dir = os.path.abspath(os.path.join(self.data_root_dir, entry["date_dir"]))
+        artifact = copy.copy(entry["artifact"])
+        for name, value in vars(artifact).items():
+            if not (isinstance(value, str) and os.path.isfile(value)):
+                continue
+            relative_path = os.path.relpath(os.path.abspath(value), source_dir)
+            if relative_path.startswith(os.pardir):
+                continue
+            target = os.path.join(self.data_root_dir, self.date_dir, relative_path)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                try:
+                    os.link(value, target)
+                except OSError:
+                    shutil.copy2(value, target)
+            setattr(artifact, name, target)
+        return artifact
+
+    def _record(self, stage: str, **fields):
+        with self._state_lock:
+            self.state["stages"][stage] = fields
+            write_yaml_file(self.state_file_path, self.state)
+
+    def record_run(self, **fields):
+        """
+        Stores run-level fields (e.g. the stage schedule) next to the per-stage records.
+        """
+        with self._state_lock:
+            self.state.update(fields)
+            write_yaml_file(self.state_file_path, self.state)
+
+    def run(self, stage: str, run_stage, key: str = None):
+        """
+        Returns the cached artifact for key, or calls run_stage() and caches its artifact.
+        Without a key the stage always runs and is only recorded in the run state.
+        """
+        try:
+            entry = self.load(stage, key) if key else None
+            if entry is not None:
+                logging.info(f"Stage {stage} unchanged (key {key[:12]}). Reusing the outputs of run {entry['date_dir']}.")
+                artifact = self._link_into_run(entry)
+                self._record(stage, status="cached", key=key, source_date_dir=entry["date_dir"])
+                return artifact
+
+            self._record(stage, status="running", key=key)
+            start = time.perf_counter()
+            artifact = run_stage()
+            seconds = round(time.perf_counter() - start, 3)
+            if self.enabled and key and artifact is not None:
+                self.save(stage, key, artifact)
+            self._record(stage, status="completed", key=key, seconds=seconds)
+            return artifact
+        except Exception as e:
+            self._record(stage, status="failed", key=key, error=str(e))
+            raise MyException(e, sys)
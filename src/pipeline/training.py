@@ -1,47 +1,192 @@
-import os, sys
+import os, sys, argparse
+from datetime import datetime
+from dotenv import load_dotenv
 from src.utils.exception_handler import MyException
 from src.utils.logger import logging
 from src.components.data_ingestion import DataIngestion
 from src.components.data_validation import DataValidation
+from src.components.data_drift import DataDrift
 from src.components.data_transformation import DataTransformation
+from src.components.hyperparameter_search import HyperparameterSearch
 from src.components.model_training import ModelTraining
 from src.components.model_evaluation import ModelEvaluation
 from src.components.model_pusher import ModelPusher
+from src.pipeline.stage_cache import StageCache
+from src.pipeline.dag import Stage, DAGExecutor, StopPipeline
+
+load_dotenv()
 
 class TrainPipeline:
-    def __init__(self):
-        pass
+    def __init__(self, resume_date_dir: str = None):
+        """
+        resume_date_dir: date_dir of an earlier run to continue; its completed stages are reused
+        """
+        self.skip_if_no_drift = os.getenv("DATA_DRIFT_SKIP_RETRAIN_IF_NO_DRIFT", "false").lower() == "true"
+        self.warm_start = os.getenv("MODEL_TRAINER_WARM_START", "false").lower() == "true"
+        if not os.getenv("DATA_ROOT_DIR"):
+            raise ValueError("DATA_ROOT_DIR is not set; it is the directory the pipeline writes its runs to")
+        if resume_date_dir and not os.path.isdir(os.path.join(os.getenv("DATA_ROOT_DIR"), resume_date_dir)):
+            raise ValueError(f"Cannot resume {resume_date_dir}: no such run under {os.getenv('DATA_ROOT_DIR')}")
+        self.date_dir = resume_date_dir or datetime.now().strftime("%Y_%m_%d_%H_%M_%S")
+        self.stage_cache = StageCache(self.date_dir)
+        if resume_date_dir and not self.stage_cache.enabled:
+            raise ValueError(f"Cannot resume {resume_date_dir} with PIPELINE_STAGE_CACHE_ENABLED=false: completed stages are only reused from the stage cache")
 
-    def run_pipeline(self):
-        try:
-            logging.info("Starting training pipeline...")
-            data_ingestion = DataIngestion()
-            data_ingestion_artifact = data_ingestion.run()
-            data_validation = DataValidation(
-                data_ingestion_artifact=data_ingestion_artifact
+    def _data_ingestion(self, inputs: dict):
+        return self.stage_cache.run(
+            "data_ingestion",
+            DataIngestion(date_dir=self.date_dir).run,
+            self.stage_cache.stage_key(DataIngestion, env_prefixes=("DATA_INGESTION_",), config_files=("SCHEMA_FILE_PATH",), resume_only=True)
+        )
+
+    def _data_validation(self, inputs: dict):
+        data_ingestion_artifact = inputs["data_ingestion"]
+        data_validation_artifact = self.stage_cache.run(
+            "data_validation",
+            DataValidation(data_ingestion_artifact=data_ingestion_artifact).run,
+            self.stage_cache.stage_key(
+                DataValidation,
+                inputs={"data_ingestion": data_ingestion_artifact},
+                env_prefixes=("DATA_VALIDATION_",),
+                config_files=("SCHEMA_FILE_PATH",)
             )
-            data_validation_artifact = data_validation.run()
-            if data_validation_artifact.validation_status == False:
-                raise MyException("Data Validation Failed. Check logs for details.", sys)
-            data_transform = DataTransformation(
-                data_ingestion_artifact=data_ingestion_artifact
+        )
+        if data_validation_artifact.validation_status == False:
+            raise MyException("Data Validation Failed. Check logs for details.", sys)
+        return data_validation_artifact
+
+    def _data_drift(self, inputs: dict):
+        data_ingestion_artifact = inputs["data_ingestion"]
+        # Drift is measured against the production reference profile, so it is only reused on resume.
+        data_drift_artifact = self.stage_cache.run(
+            "data_drift",
+            DataDrift(data_ingestion_artifact=data_ingestion_artifact).run,
+            self.stage_cache.stage_key(
+                DataDrift,
+                inputs={"data_ingestion": data_ingestion_artifact},
+                env_prefixes=("DATA_DRIFT_", "MODEL_NAME"),
+                config_files=("SCHEMA_FILE_PATH",),
+                resume_only=True
+            )
+        )
+        if self.skip_if_no_drift and not data_drift_artifact.drift_detected:
+            raise StopPipeline("No data drift against the production training set. Skipping retraining.")
+        return data_drift_artifact
+
+    def _data_transformation(self, inputs: dict):
+        data_ingestion_artifact = inputs["data_ingestion"]
+        # Warm start reads the production preprocessor and model, so those stages are only reused on resume.
+        return self.stage_cache.run(
+            "data_transformation",
+            DataTransformation(data_ingestion_artifact=data_ingestion_artifact).run,
+            self.stage_cache.stage_key(
+                DataTransformation,
+                inputs={"data_ingestion": data_ingestion_artifact},
+                env_prefixes=("DATA_TRANSFORMATION_", "TRANSFORMED_", "PREPROCESSED_OBJECT_", "TARGET_COLUMN", "MODEL_TRAINER_WARM_START", "DATA_FEATURE_STORE_"),
+                # The search setting decides whether the training set is also kept before rebalancing.
+                config_files=("SCHEMA_FILE_PATH", "MODEL_CONFIG_FILE_PATH"),
+                resume_only=self.warm_start
             )
-            data_transform_artifact = data_transform.run()
-            model_trainer = ModelTraining(
-                data_ingestion_artifact=data_ingestion_artifact,
-                data_transformation_artifact=data_transform_artifact
+        )
+
+    def _hyperparameter_search(self, inputs: dict):
+        data_transform_artifact = inputs["data_transformation"]
+        hyperparameter_search = HyperparameterSearch(
+            data_transformation_artifact=data_transform_artifact,
+            data_ingestion_artifact=inputs["data_ingestion"]
+        )
+        if not hyperparameter_search.enabled:
+            return None
+        return self.stage_cache.run(
+            "hyperparameter_search",
+            hyperparameter_search.run,
+            self.stage_cache.stage_key(
+                HyperparameterSearch,
+                inputs={"data_transformation": data_transform_artifact},
+                env_prefixes=("MODEL_SEARCH_", "DATA_TRANSFORMATION_REBALANCE_", "DATA_TRANSFORMATION_ENN_"),
+                config_files=("MODEL_CONFIG_FILE_PATH",)
             )
-            model_trainer_artifact = model_trainer.run()
-            model_evaluation = ModelEvaluation()
-            model_eval_artifact = model_evaluation.run(
-                model_trainer_artifact
+        )
+
+    def _model_training(self, inputs: dict):
+        data_transform_artifact = inputs["data_transformation"]
+        hyperparameter_search_artifact = inputs["hyperparameter_search"]
+        return self.stage_cache.run(
+            "model_training",
+            ModelTraining(
+                data_ingestion_artifact=inputs["data_ingestion"],
+                data_transformation_artifact=data_transform_artifact,
+                hyperparameter_search_artifact=hyperparameter_search_artifact
+            ).run,
+            self.stage_cache.stage_key(
+                ModelTraining,
+                inputs={"data_transformation": data_transform_artifact, "hyperparameter_search": hyperparameter_search_artifact},
+                env_prefixes=("MODEL_TRAINER_",),
+                config_files=("MODEL_CONFIG_FILE_PATH",),
+                resume_only=self.warm_start
             )
-            if model_eval_artifact.push_model:
-                model_pusher = ModelPusher()
-                model_pusher.run(model_eval_artifact,data_transform_artifact, model_trainer_artifact)
-                logging.info("New model accepted and pushed to production.")
+        )
+
+    # Evaluation and pushing compare against and write to the registry, so they always run.
+    def _production_metrics(self, inputs: dict):
+        return self.stage_cache.run("production_metrics", self.model_evaluation.fetch_production_metrics)
+
+    def _model_evaluation(self, inputs: dict):
+        return self.stage_cache.run("model_evaluation", lambda: self.model_evaluation.run(inputs["model_training"]))
+
+    def _model_pusher(self, inputs: dict):
+        model_eval_artifact = inputs["model_evaluation"]
+        if not model_eval_artifact.push_model:
+            logging.info("Model rejected during evaluation. Skipping model push.")
+            return None
+        model_pusher_artifact = self.stage_cache.run(
+            "model_pusher",
+            lambda: ModelPusher().run(model_eval_artifact, inputs["data_transformation"], inputs["model_training"], inputs["data_drift"])
+        )
+        logging.info("New model accepted and pushed to production.")
+        return model_pusher_artifact
 
+    def stages(self) -> list:
+        """
+        The pipeline as a dependency graph. Transformation only needs the ingested data, so it runs
+        alongside validation and drift; search and training wait for both checks to pass. When a run
+        without drift is skipped, transformation waits for drift instead, so skipped runs do not pay for
+        it. The production metrics are fetched from the start, while the model trains.
+        """
+        transformation_depends_on = ("data_ingestion", "data_drift") if self.skip_if_no_drift else ("data_ingestion",)
+        return [
+            Stage("data_ingestion", self._data_ingestion),
+            Stage("production_metrics", self._production_metrics),
+            Stage("data_validation", self._data_validation, depends_on=("data_ingestion",)),
+            Stage("data_drift", self._data_drift, depends_on=("data_ingestion",)),
+            Stage("data_transformation", self._data_transformation, depends_on=transformation_depends_on),
+            Stage("hyperparameter_search", self._hyperparameter_search, depends_on=("data_ingestion", "data_transformation", "data_validation", "data_drift")),
+            Stage("model_training", self._model_training, depends_on=("data_ingestion", "data_transformation", "hyperparameter_search")),
+            Stage("model_evaluation", self._model_evaluation, depends_on=("model_training", "production_metrics")),
+            Stage("model_pusher", self._model_pusher, depends_on=("model_evaluation", "data_transformation", "model_training", "data_drift"))
+        ]
+
+    def run_pipeline(self):
+        try:
+            logging.info(f"Starting training pipeline (run {self.date_dir})...")
+            self.model_evaluation = ModelEvaluation()
+            executor = DAGExecutor(self.stages())
+            try:
+                executor.run()
+            finally:
+                report = executor.report()
+                self.stage_cache.record_run(schedule=report)
+                logging.info(f"Pipeline schedule: {report['wall_seconds']}s wall, {report['stage_seconds']}s of stage time, critical path {' -> '.join(report['critical_path'])}")
+            if executor.stopped:
+                logging.info(executor.stopped)
+                return
             logging.info("Training pipeline completed successfully.")
         except Exception as e:
             logging.error(f"Error in training pipeline: {e}")
-            raise MyException(e, sys)
\ No newline at end of file
+            raise MyException(e, sys)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the training pipeline.")
+    parser.add_argument("--resume", metavar="DATE_DIR", default=None, help="continue a failed run from its last completed stage")
+    args = parser.parse_args()
+    TrainPipeline(resume_date_dir=args.resume).run_pipeline()
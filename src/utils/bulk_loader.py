@@ -0,0 +1,168 @@
+"""
+Bulk CSV → MongoDB loader.
+
+Streams the CSV in chunks, writes each chunk with an unordered insert_many or bulk_write of
+upserts from a worker pool, and checkpoints finished chunks so an interrupted load resumes
+where it stopped.
+
+Usage:
+    python -m src.utils.bulk_loader data.csv --chunk-size 10000 --workers 4 --upsert
+"""
+import os, sys, json, time, argparse, threading
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dotenv import load_dotenv
+from pymongo import ReplaceOne
+from .mongo_helper import connect_to_mongo, mongo_pool_stats
+from .logger import logging
+from .exception_handler import MyException
+
+load_dotenv()
+
+
+class LoadCheckpoint:
+    """
+    Records which chunk indices of a source file have been written. The checkpoint is only
+    reused for the same file (path, size, mtime) and chunk size; otherwise it starts over.
+    """
+    def __init__(self, checkpoint_path: str, data_path: str, chunk_size: int):
+        self.checkpoint_path = checkpoint_path
+        stat = os.stat(data_path)
+        self.identity = {
+            "source": os.path.abspath(data_path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chunk_size": chunk_size
+        }
+        self.completed = set()
+        self._lock = threading.Lock()
+
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as file:
+                saved = json.load(file)
+            if {k: saved.get(k) for k in self.identity} == self.identity:
+                self.completed = set(saved["completed"])
+                logging.info(f"Resuming load: {len(self.completed)} chunks already done per {checkpoint_path}")
+            else:
+                logging.warning(f"Checkpoint {checkpoint_path} belongs to a different file or chunk size. Starting over.")
+
+    def mark_done(self, chunk_index: int):
+        with self._lock:
+            self.completed.add(chunk_index)
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump({**self.identity, "completed": sorted(self.completed)}, file)
+            os.replace(tmp_path, self.checkpoint_path)
+
+    def clear(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+def _write_chunk(collection, records: list, upsert: bool, key: str) -> int:
+    if upsert:
+        operations = [ReplaceOne({key: record[key]}, record, upsert=True) for record in records]
+        result = collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.matched_count
+    result = collection.insert_many(records, ordered=False)
+    return len(result.inserted_ids)
+
+
+def load_csv_to_mongo(
+    data_path: str,
+    chunk_size: int = None,
+    workers: int = None,
+    upsert: bool = None,
+    key: str = None,
+    checkpoint_path: str = None,
+    reset: bool = False
+) -> dict:
+    """
+    Loads a CSV file into DB_NAME/COLLECTION_NAME and returns load statistics.
+
+    With upsert (the default) every row is a ReplaceOne keyed on `key`, so re-running a chunk is
+    idempotent. Plain inserts are faster but a chunk interrupted mid-write is inserted again on resume.
+    """
+    try:
+        chunk_size = chunk_size or int(os.getenv("MONGO_BULK_CHUNK_SIZE", 10000))
+        workers = workers or int(os.getenv("MONGO_BULK_WORKERS", 4))
+        upsert = upsert if upsert is not None else os.getenv("MONGO_BULK_UPSERT", "true").lower() == "true"
+        key = key or os.getenv("MONGO_BULK_KEY", "id")
+        checkpoint = LoadCheckpoint(checkpoint_path or f"{data_path}.checkpoint.json", data_path, chunk_size)
+        if reset:
+            checkpoint.clear()
+            checkpoint.completed = set()
+
+        client = connect_to_mongo()
+        collection = client[os.getenv("DB_NAME")][os.getenv("COLLECTION_NAME")]
+        if upsert:
+            collection.create_index(key, unique=True)
+
+        start = time.perf_counter()
+        rows_written = 0
+        skipped = 0
+        # Bound the chunks held in memory to a couple per worker.
+        max_pending = workers * 2
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            for chunk_index, chunk in enumerate(pd.read_csv(data_path, chunksize=chunk_size)):
+                if chunk_index in checkpoint.completed:
+                    skipped += 1
+                    continue
+                records = chunk.to_dict(orient="records")
+                pending[executor.submit(_write_chunk, collection, records, upsert, key)] = chunk_index
+
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        rows_written += future.result()
+                        checkpoint.mark_done(pending.pop(future))
+                        logging.info(f"Loaded {rows_written} rows ({rows_written / (time.perf_counter() - start):.0f} rows/s)")
+
+            for future in list(pending):
+                rows_written += future.result()
+                checkpoint.mark_done(pending.pop(future))
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "rows": rows_written,
+            "chunks": len(checkpoint.completed),
+            "skipped_chunks": skipped,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_written / elapsed, 1) if elapsed else 0.0
+        }
+        logging.info(f"Bulk load of {data_path} finished: {stats}")
+        logging.info(f"Mongo connection pool: {mongo_pool_stats()}")
+        checkpoint.clear()
+        return stats
+    except Exception as e:
+        logging.error(f"Error occurred while bulk loading data: {e}")
+        raise MyException(e, sys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load a CSV file into MongoDB.")
+    parser.add_argument("data_path")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--upsert", dest="upsert", action="store_true", default=None, help="idempotent ReplaceOne upserts keyed on --key")
+    parser.add_argument("--insert", dest="upsert", action="store_false", help="plain unordered insert_many")
+    parser.add_argument("--key", default=None)
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: <data_path>.checkpoint.json)")
+    parser.add_argument("--reset", action="store_true", help="ignore any existing checkpoint")
+    args = parser.parse_args()
+
+    stats = load_csv_to_mongo(
+        args.data_path,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        upsert=args.upsert,
+        key=args.key,
+        checkpoint_path=args.checkpoint,
+        reset=args.reset
+    )
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
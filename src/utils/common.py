@@ -1,5 +1,8 @@
-import os, sys, dill, yaml
+import os, sys, dill, yaml, shutil
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pandas import DataFrame
 from .exception_handler import MyException
 from .logger import logging
@@ -26,6 +29,123 @@ def write_yaml_file(file_path: str, content: object, replace: bool = False) -> N
         raise MyException(e, sys) from e
 
 
+# pandas dtypes for the type names used in config/schema.yaml. Integers are nullable so that
+# documents missing a field do not force the whole column to float.
+SCHEMA_DTYPES = {"int": "Int64", "float": "float64", "category": "object"}
+
+
+def get_schema_dtypes(schema: dict) -> dict:
+    """
+    Returns {column: pandas dtype} for the columns declared in schema.yaml, in schema order.
+    schema: dict parsed schema.yaml
+    """
+    return {
+        column: SCHEMA_DTYPES[dtype]
+        for entry in schema["columns"]
+        for column, dtype in entry.items()
+    }
+
+
+ARROW_TYPES = {"Int64": pa.int64(), "float64": pa.float64(), "object": pa.string()}
+
+
+def get_arrow_schema(schema_dtypes: dict) -> pa.Schema:
+    """
+    Returns the Arrow schema matching get_schema_dtypes output.
+    """
+    return pa.schema([(column, ARROW_TYPES[dtype]) for column, dtype in schema_dtypes.items()])
+
+
+class FeatureStoreWriter:
+    """
+    Incrementally writes DataFrames to a feature store file. The format follows the extension:
+    .parquet is written as typed row groups, anything else as CSV.
+    """
+    def __init__(self, file_path: str, schema_dtypes: dict):
+        self.file_path = file_path
+        self.schema_dtypes = schema_dtypes
+        self.is_parquet = file_path.endswith(".parquet")
+        self.rows = 0
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if self.is_parquet:
+            self.arrow_schema = get_arrow_schema(schema_dtypes)
+            self._writer = pq.ParquetWriter(file_path, self.arrow_schema)
+        else:
+            pd.DataFrame({column: pd.array([], dtype=dtype) for column, dtype in schema_dtypes.items()}).to_csv(file_path, index=False)
+
+    def write(self, df: DataFrame):
+        if self.is_parquet:
+            self._writer.write_table(pa.Table.from_pandas(df, schema=self.arrow_schema, preserve_index=False))
+        else:
+            df.to_csv(self.file_path, mode='a', header=False, index=False)
+        self.rows += len(df)
+
+    def append_file(self, file_path: str):
+        """
+        Appends the rows of another feature store file of the same format without loading it whole.
+        """
+        if self.is_parquet:
+            for batch in pq.ParquetFile(file_path).iter_batches():
+                self._writer.write_batch(batch)
+                self.rows += batch.num_rows
+        else:
+            with open(file_path, 'rb') as part, open(self.file_path, 'ab') as merged:
+                part.readline()
+                shutil.copyfileobj(part, merged)
+
+    def close(self):
+        if self.is_parquet:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_feature_table(file_path: str, columns: list = None, memory_map: bool = False) -> DataFrame:
+    """
+    Reads a feature store file (Parquet or CSV by extension), optionally only some columns.
+    file_path: str location of file to read
+    columns: list of columns to load, all when None
+    memory_map: bool memory-map Parquet files instead of reading them into a buffer
+    """
+    try:
+        if file_path.endswith(".parquet"):
+            return pq.read_table(file_path, columns=columns, memory_map=memory_map).to_pandas()
+        return pd.read_csv(file_path, usecols=columns)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def iter_feature_batches(file_path: str, batch_size: int, columns: list = None):
+    """
+    Yields a feature store file (Parquet or CSV by extension) as DataFrames of at most batch_size rows,
+    so callers can stream files that do not fit in memory.
+    """
+    try:
+        if file_path.endswith(".parquet"):
+            for batch in pq.ParquetFile(file_path).iter_batches(batch_size=batch_size, columns=columns):
+                yield batch.to_pandas()
+        else:
+            yield from pd.read_csv(file_path, usecols=columns, chunksize=batch_size)
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def read_feature_columns(file_path: str) -> list:
+    """
+    Returns the column names of a feature store file without reading any rows.
+    """
+    try:
+        if file_path.endswith(".parquet"):
+            return pq.read_schema(file_path).names
+        return pd.read_csv(file_path, nrows=0).columns.tolist()
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
 def load_object(file_path: str) -> object:
     """
     Returns model/object from project directory.
@@ -54,13 +174,16 @@ def save_numpy_array_data(file_path: str, array: np.array):
         raise MyException(e, sys) from e
 
 
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
     load numpy array data from file
     file_path: str location of file to load
+    mmap_mode: str memory-map the file instead of reading it ("r", "r+", "c"), None reads it into memory
     return: np.array data loaded
     """
     try:
+        if mmap_mode:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, 'rb') as file_obj:
             return np.load(file_obj)
     except Exception as e:
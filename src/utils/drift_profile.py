@@ -0,0 +1,141 @@
+"""
+Compact per-feature reference profiles and drift statistics.
+
+A profile holds, for every feature,
+    numeric:     bin cut points and the share of rows in each bin; bins are [cut_{i-1}, cut_i),
+                 so a binary column whose deciles all equal 1 still splits into 0s and 1s
+    categorical: the share of rows per level
+It is small enough to ship next to the model in the registry (a few KB as YAML).
+
+ProfileBuilder streams a feature file once. For numeric columns it keeps a bounded uniform sample
+(each row gets a random key and the sample_size smallest keys survive every chunk), from which the
+new profile's decile cut points and bin shares are taken. When a reference profile is given, it also
+counts every row exactly into the reference bins, so the drift statistics against that reference do
+not depend on the sample.
+
+Drift statistics per feature:
+    psi: population stability index over the reference bins / levels
+    ks:  largest gap between the binned reference and current CDFs (numeric features only)
+"""
+import numpy as np
+import pandas as pd
+
+# Floor for empty bins so PSI stays finite.
+PSI_EPSILON = 1e-4
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    expected = np.clip(expected, PSI_EPSILON, None)
+    actual = np.clip(actual, PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def _shares(counts: np.ndarray) -> np.ndarray:
+    total = counts.sum()
+    return counts / total if total else counts.astype("float64")
+
+
+def _bin_index(cuts: np.ndarray, values: np.ndarray, closed: str = "left") -> np.ndarray:
+    """
+    Bin of every value. closed="left" → [cut_{i-1}, cut_i); "right" → (cut_{i-1}, cut_i], the binning
+    of profiles written before the "closed" field existed.
+    """
+    return np.searchsorted(cuts, values, side="right" if closed == "left" else "left")
+
+
+class _NumericSketch:
+    def __init__(self, sample_size: int, reference: dict = None, rng=None):
+        self.sample_size = sample_size
+        self.rng = rng
+        self.keys = np.empty(0)
+        self.sample = np.empty(0)
+        self.cuts = np.asarray(reference["cuts"], dtype="float64") if reference else None
+        self.closed = reference.get("closed", "right") if reference else None
+        self.counts = np.zeros(len(self.cuts) + 1, dtype="int64") if reference else None
+
+    def update(self, values: np.ndarray):
+        if self.cuts is not None:
+            self.counts += np.bincount(_bin_index(self.cuts, values, self.closed), minlength=len(self.counts))
+
+        keys = np.concatenate([self.keys, self.rng.random(len(values))])
+        sample = np.concatenate([self.sample, values])
+        if len(keys) > self.sample_size:
+            keep = np.argpartition(keys, self.sample_size)[:self.sample_size]
+            keys, sample = keys[keep], sample[keep]
+        self.keys, self.sample = keys, sample
+
+    def profile(self, bins: int) -> dict:
+        cuts = np.unique(np.quantile(self.sample, np.linspace(0, 1, bins + 1)[1:-1])) if len(self.sample) else np.empty(0)
+        counts = np.bincount(_bin_index(cuts, self.sample), minlength=len(cuts) + 1)
+        return {"kind": "numeric", "closed": "left", "cuts": cuts.tolist(), "shares": _shares(counts).tolist()}
+
+
+class _CategoricalSketch:
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, values: pd.Series):
+        for level, count in values.value_counts().items():
+            self.counts[level] = self.counts.get(level, 0) + int(count)
+
+    def profile(self) -> dict:
+        total = sum(self.counts.values())
+        return {"kind": "categorical", "shares": {level: count / total for level, count in sorted(self.counts.items())}}
+
+
+class ProfileBuilder:
+    """
+    Streams chunks of a feature file into a new profile and, if reference is given, into exact
+    counts over the reference bins for drift scoring.
+    """
+    def __init__(self, numeric_columns: list, categorical_columns: list, reference: dict = None,
+                 bins: int = 10, sample_size: int = 50000, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        reference = reference or {}
+        self.bins = bins
+        self.reference = reference
+        self.numeric = {
+            column: _NumericSketch(sample_size, reference.get(column), rng)
+            for column in numeric_columns
+        }
+        self.categorical = {column: _CategoricalSketch() for column in categorical_columns}
+        self.rows = 0
+
+    def update(self, df: pd.DataFrame):
+        self.rows += len(df)
+        for column, sketch in self.numeric.items():
+            values = pd.to_numeric(df[column], errors="coerce").astype("float64").to_numpy()
+            sketch.update(values[~np.isnan(values)])
+        for column, sketch in self.categorical.items():
+            sketch.update(df[column].dropna())
+
+    def profile(self) -> dict:
+        profile = {column: sketch.profile(self.bins) for column, sketch in self.numeric.items()}
+        profile.update({column: sketch.profile() for column, sketch in self.categorical.items()})
+        return profile
+
+    def drift(self) -> dict:
+        """
+        Returns {feature: {"psi": ..., "ks": ...}} against the reference profile.
+        Features missing from the reference are skipped.
+        """
+        results = {}
+        for column, sketch in self.numeric.items():
+            if sketch.counts is None:
+                continue
+            expected = np.asarray(self.reference[column]["shares"], dtype="float64")
+            actual = _shares(sketch.counts)
+            results[column] = {
+                "psi": population_stability_index(expected, actual),
+                "ks": float(np.max(np.abs(np.cumsum(expected) - np.cumsum(actual))))
+            }
+
+        for column, sketch in self.categorical.items():
+            if column not in self.reference:
+                continue
+            expected_shares = self.reference[column]["shares"]
+            levels = sorted(set(expected_shares) | set(sketch.counts))
+            expected = np.array([expected_shares.get(level, 0.0) for level in levels])
+            actual = _shares(np.array([sketch.counts.get(level, 0) for level in levels]))
+            results[column] = {"psi": population_stability_index(expected, actual)}
+        return results
@@ -0,0 +1,112 @@
+"""
+Memory-mappable artifact format for fitted models and preprocessors.
+
+File layout:
+    magic (8 bytes) | header length (uint64, little endian) | header pickle | padding | array data
+
+The header is the object pickled with every sufficiently large NumPy array swapped for a reference
+into the array data section. Each array is stored uncompressed at a page-aligned offset, so loading
+mmaps the file and hands the unpickler read-only views onto the mapping.
+
+Only objects that keep those arrays as plain ndarray state (FlatForest, fitted scalers) end up backed
+by the mapping. Classes whose __setstate__ copies its arrays keep a private copy per process: sklearn's
+Tree copies its node and value arrays into memory it owns, so a RandomForest loaded from model.mmap is
+no smaller per worker than an unpickled one. Serve forest.mmap to share a forest between workers.
+"""
+import os, sys, io, mmap, pickle, struct
+import numpy as np
+from .exception_handler import MyException
+from .logger import logging
+
+MAGIC = b"VIPMMAP1"
+PAGE_SIZE = mmap.ALLOCATIONGRANULARITY
+# Smaller arrays stay inline in the pickle; mapping them would waste most of a page each.
+MIN_MAPPED_BYTES = 4096
+
+
+def _align(offset: int) -> int:
+    return -(-offset // PAGE_SIZE) * PAGE_SIZE
+
+
+class _ArrayPickler(pickle.Pickler):
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = []
+        self.manifest = []
+        self._offset = 0
+
+    def persistent_id(self, obj):
+        if type(obj) is not np.ndarray and not isinstance(obj, np.memmap):
+            return None
+        if obj.dtype.hasobject or obj.nbytes < MIN_MAPPED_BYTES:
+            return None
+        order = "F" if obj.flags.f_contiguous and not obj.flags.c_contiguous else "C"
+        self.manifest.append({"dtype": obj.dtype, "shape": obj.shape, "order": order, "offset": self._offset, "nbytes": obj.nbytes})
+        self.arrays.append((obj, order))
+        self._offset = _align(self._offset + obj.nbytes)
+        return len(self.manifest) - 1
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    def __init__(self, file, buffer, data_start: int, manifest: list):
+        super().__init__(file)
+        self.buffer = buffer
+        self.data_start = data_start
+        self.manifest = manifest
+
+    def persistent_load(self, index):
+        entry = self.manifest[index]
+        count = entry["nbytes"] // entry["dtype"].itemsize
+        array = np.frombuffer(self.buffer, dtype=entry["dtype"], count=count, offset=self.data_start + entry["offset"])
+        return array.reshape(entry["shape"], order=entry["order"])
+
+
+def save_mmap_object(file_path: str, obj: object) -> None:
+    """
+    Writes obj in the memory-mappable artifact format.
+    file_path: str location of file to save
+    obj: object to save (model, preprocessor, FlatForest, ...)
+    """
+    try:
+        payload = io.BytesIO()
+        pickler = _ArrayPickler(payload)
+        pickler.dump(obj)
+        header = pickle.dumps({"manifest": pickler.manifest, "payload": payload.getvalue()}, protocol=pickle.HIGHEST_PROTOCOL)
+
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        data_start = _align(len(MAGIC) + 8 + len(header))
+        with open(file_path, "wb") as file_obj:
+            file_obj.write(MAGIC)
+            file_obj.write(struct.pack("<Q", len(header)))
+            file_obj.write(header)
+            for (array, order), entry in zip(pickler.arrays, pickler.manifest):
+                file_obj.seek(data_start + entry["offset"])
+                file_obj.write(array.tobytes(order=order))
+        logging.info(f"Saved mmap artifact with {len(pickler.arrays)} mapped arrays to {file_path}")
+    except Exception as e:
+        raise MyException(e, sys) from e
+
+
+def load_mmap_object(file_path: str) -> object:
+    """
+    Opens an artifact written by save_mmap_object. Large arrays are unpickled as read-only views onto
+    the mapped file (unless the owning object copies them); the mapping stays alive as long as any of
+    those views is referenced.
+    file_path: str location of file to load
+    return: Model/Obj
+    """
+    try:
+        with open(file_path, "rb") as file_obj:
+            buffer = mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{file_path} is not an mmap artifact")
+        (header_length,) = struct.unpack("<Q", buffer[len(MAGIC):len(MAGIC) + 8])
+        header_start = len(MAGIC) + 8
+        header = pickle.loads(buffer[header_start:header_start + header_length])
+        data_start = _align(header_start + header_length)
+        unpickler = _ArrayUnpickler(io.BytesIO(header["payload"]), buffer, data_start, header["manifest"])
+        return unpickler.load()
+    except Exception as e:
+        raise MyException(e, sys) from e
@@ -0,0 +1,94 @@
+"""
+Model families ModelTraining can train, selected with `backend` in config/model.yaml.
+
+Every backend produces a fitted sklearn classifier with predict, predict_proba and classes_, and is
+saved the same way, so ModelEvaluation, ModelPusher and PredictionPipeline work with any of them.
+"""
+import os
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from .common import read_yaml_file
+
+
+class ModelBackend:
+    def __init__(self, name: str, estimator_class, env_params: dict = None, supports_n_jobs: bool = False, supports_warm_start: bool = False):
+        """
+        env_params → {parameter: (environment variable, type)} read as the base hyperparameters
+        supports_n_jobs → whether the estimator takes n_jobs (otherwise it manages its own threads)
+        supports_warm_start → whether ModelTraining may grow the production model instead of refitting
+        """
+        self.name = name
+        self.estimator_class = estimator_class
+        self.env_params = env_params or {}
+        self.supports_n_jobs = supports_n_jobs
+        self.supports_warm_start = supports_warm_start
+
+    def backend_config(self, config: dict) -> dict:
+        return (config.get("backends") or {}).get(self.name) or {}
+
+    def default_params(self, config: dict) -> dict:
+        """
+        Base hyperparameters: the environment values, overridden by `backends.<name>.params`.
+        """
+        params = {
+            param: cast(os.getenv(env_var))
+            for param, (env_var, cast) in self.env_params.items()
+            if os.getenv(env_var) is not None
+        }
+        params.update(self.backend_config(config).get("params") or {})
+        return params
+
+    def param_space(self, config: dict) -> dict:
+        return self.backend_config(config).get("param_space") or {}
+
+    def tracked_params(self, config: dict) -> list:
+        """
+        Hyperparameters reported in the training metrics: the configured ones and the searched ones.
+        """
+        backend_config = self.backend_config(config)
+        return sorted(set(self.env_params) | set(backend_config.get("params") or {}) | set(self.param_space(config)))
+
+    def create(self, params: dict, class_weight=None, random_state: int = None, n_jobs: int = None):
+        params = dict(params, class_weight=class_weight, random_state=random_state)
+        if self.supports_n_jobs:
+            params["n_jobs"] = n_jobs
+        return self.estimator_class(**params)
+
+    def size(self, model) -> int:
+        """
+        Number of trees (forests) or boosting iterations.
+        """
+        return len(model.estimators_) if hasattr(model, "estimators_") else int(model.n_iter_)
+
+
+MODEL_BACKENDS = {
+    backend.name: backend
+    for backend in (
+        ModelBackend(
+            "random_forest",
+            RandomForestClassifier,
+            env_params={
+                "n_estimators": ("MODEL_TRAINER_N_ESTIMATORS", int),
+                "min_samples_split": ("MODEL_TRAINER_MIN_SAMPLES_SPLIT", int),
+                "min_samples_leaf": ("MODEL_TRAINER_MIN_SAMPLES_LEAF", int),
+                "max_depth": ("MODEL_TRAINER_MAX_DEPTH", int),
+                "criterion": ("MODEL_TRAINER_CRITERION", str)
+            },
+            supports_n_jobs=True,
+            supports_warm_start=True
+        ),
+        # Bins features into at most 255 levels and grows trees on the histograms: much faster to
+        # train and smaller to ship than a deep forest on hundreds of thousands of rows.
+        ModelBackend("hist_gradient_boosting", HistGradientBoostingClassifier)
+    )
+}
+
+
+def load_model_config() -> dict:
+    return read_yaml_file(os.getenv("MODEL_CONFIG_FILE_PATH")) or {}
+
+
+def get_model_backend(config: dict) -> ModelBackend:
+    name = config.get("backend", "random_forest")
+    if name not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model backend {name!r}. Expected one of {sorted(MODEL_BACKENDS)}")
+    return MODEL_BACKENDS[name]
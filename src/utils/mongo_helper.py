@@ -1,50 +1,189 @@
 from pymongo.mongo_client import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo import monitoring
 from dotenv import load_dotenv
-import os, sys
-import pandas as pd
+import os, sys, threading
 from .logger import logging
 from .exception_handler import MyException
 
 load_dotenv()
 
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Counts connection pool events across every server the client talks to.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                "connections_created": 0,
+                "connections_closed": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "pool_clears": 0,
+                "in_use": 0,
+                "peak_in_use": 0
+            }
+
+    def _add(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+            if name == "in_use":
+                self.counters["peak_in_use"] = max(self.counters["peak_in_use"], self.counters["in_use"])
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add("pool_clears")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add("connections_created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add("connections_closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._add("checkout_failures")
+
+    def connection_checked_out(self, event):
+        self._add("checkouts")
+        self._add("in_use")
+
+    def connection_checked_in(self, event):
+        self._add("in_use", -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self.counters)
+        counters["open"] = counters["connections_created"] - counters["connections_closed"]
+        return counters
+
+
+class MongoClientManager:
+    """
+    Holds one pooled MongoClient per process. MongoClient is thread-safe and keeps its own
+    connection pool, so every caller in the process shares it instead of paying a new TLS and auth
+    handshake each time.
+
+    MongoClient is not fork-safe: a child process that inherits the parent's client gets a fresh one
+    on first use, detected by comparing the creating pid with os.getpid().
+    """
+    def __init__(self):
+        self._client = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.listener = PoolStatsListener()
+
+    def _client_options(self) -> dict:
+        options = {
+            "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", 20)),
+            "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", 0)),
+            "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", 300000)),
+            "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 30000)),
+            "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 20000)),
+            "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 0)) or None,
+            "readPreference": os.getenv("MONGO_READ_PREFERENCE", "primary"),
+            "appname": os.getenv("MONGO_APP_NAME", "vehicle-insurance-pipeline"),
+            "event_listeners": [self.listener]
+        }
+        compressors = os.getenv("MONGO_COMPRESSORS", "")
+        if compressors:
+            options["compressors"] = compressors
+        return options
+
+    def get_client(self) -> MongoClient:
+        """
+        Returns this process's client, creating and pinging it on first use.
+        """
+        pid = os.getpid()
+        client = self._client
+        if client is not None and self._pid == pid:
+            return client
+
+        with self._lock:
+            if self._client is not None and self._pid != pid:
+                # Inherited across fork: the parent's sockets and monitor threads are unusable here.
+                # Drop the reference without closing, since closing would touch the parent's sockets.
+                logging.info(f"MongoClient inherited from process {self._pid}; creating a new one in {pid}.")
+                self._client = None
+                self.listener.reset()
+            if self._client is None:
+                client = MongoClient(os.getenv("CONNECTION_STRING"), **self._client_options())
+                client.admin.command("ping")
+                self._client, self._pid = client, pid
+                logging.info("Successfully connected to MongoDB.")
+            return self._client
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def stats(self) -> dict:
+        client = self._client if self._pid == os.getpid() else None
+        return {
+            "connected": client is not None,
+            "max_pool_size": client.options.pool_options.max_pool_size if client is not None else None,
+            **self.listener.stats()
+        }
+
+
+mongo_client_manager = MongoClientManager()
+
+
 def connect_to_mongo():
     """
-    Establishes a connection to the MongoDB database.
+    Returns the process-wide pooled MongoDB client, connecting on first use.
     """
     try:
-        string  = os.getenv("CONNECTION_STRING")
-        client = MongoClient(string)
-        client.admin.command("ping")
-        logging.info("Successfully connected to MongoDB.")
-        return client
+        return mongo_client_manager.get_client()
     except (ConnectionFailure, ServerSelectionTimeoutError) as e:
         logging.error(f"Error connecting to MongoDB: {e}")
         raise MyException(e, sys)
 
-def push_data_to_mongo(data_path: str):
-    """
-    Pushes data from a CSV file to the specified MongoDB collection.
-    """
-    try:
-        client = connect_to_mongo()
 
-        string = os.getenv("CONNECTION_STRING")
-        db_name = os.getenv("DB_NAME")
-        collection_name = os.getenv("COLLECTION_NAME")
+def close_mongo_client():
+    mongo_client_manager.close()
 
-        db = client[db_name]
-        collection = db[collection_name]
 
-        df = pd.read_csv(data_path)
-        data = df.to_dict(orient="records")
+def mongo_pool_stats() -> dict:
+    """
+    Returns connection pool utilization counters for this process's client.
+    """
+    return mongo_client_manager.stats()
+
 
-        res = collection.insert_many(data)
-        logging.info(f"Inserted {len(res.inserted_ids)} records into the collection.")
+def push_data_to_mongo(data_path: str, upsert: bool = None):
+    """
+    Pushes data from a CSV file to the specified MongoDB collection.
+    Delegates to the chunked, parallel bulk loader (see src/utils/bulk_loader.py).
+    upsert: replace documents by MONGO_BULK_KEY (creating a unique index on it) instead of inserting them;
+    None follows MONGO_BULK_UPSERT, like the bulk loader CLI
+    """
+    from .bulk_loader import load_csv_to_mongo
 
-    except Exception as e:
-        logging.error(f"Error occurred while inserting data: {e}")
-        raise MyException(e, sys)
+    stats = load_csv_to_mongo(data_path, upsert=upsert)
+    logging.info(f"Inserted {stats['rows']} records into the collection.")
+    return stats
 
 if __name__ == "__main__":
     push_data_to_mongo("data.csv")
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Class rebalancing strategies for the transformed training matrix.
+
+    smoteenn      SMOTE followed by ENN cleaning over the whole dataset (k-NN over every sample)
+    chunked_enn   SMOTE, then ENN run independently on random chunks of enn_chunk_size rows,
+                  so the neighbour searches grow linearly with the data instead of super-linearly
+    smote         SMOTE oversampling only
+    random_over   duplicate minority rows at random
+    random_under  drop majority rows at random
+    class_weight  no resampling; the model is trained with class_weight="balanced"
+    none          no rebalancing
+
+Every resampling strategy runs in a child process, which reports its wall time and peak memory: the
+growth of the child's peak resident set size (ru_maxrss) while resampling. Pipeline stages run in
+threads of one process, so an in-process measure (tracemalloc, the parent's ru_maxrss) would also count
+the other stages' allocations. The report also records the size of the matrix before and after.
+"""
+import sys, time, resource, multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from imblearn.combine import SMOTEENN
+from imblearn.over_sampling import SMOTE, RandomOverSampler
+from imblearn.under_sampling import RandomUnderSampler, EditedNearestNeighbours
+
+REBALANCE_STRATEGIES = ("smoteenn", "chunked_enn", "smote", "random_over", "random_under", "class_weight", "none")
+# Strategies that add, drop or synthesize rows.
+RESAMPLING_STRATEGIES = ("smoteenn", "chunked_enn", "smote", "random_over", "random_under")
+
+
+def _class_counts(y: np.ndarray) -> dict:
+    classes, counts = np.unique(y, return_counts=True)
+    return {int(label): int(count) for label, count in zip(classes, counts)}
+
+
+def chunked_smote_enn(X: np.ndarray, y: np.ndarray, chunk_size: int, random_state: int = 42, n_jobs: int = None):
+    """
+    SMOTE over the whole matrix, then ENN cleaning within random chunks of chunk_size rows.
+    """
+    X_resampled, y_resampled = SMOTE(random_state=random_state).fit_resample(X, y)
+    order = np.random.default_rng(random_state).permutation(len(y_resampled))
+    keep = []
+    for start in range(0, len(order), chunk_size):
+        index = order[start:start + chunk_size]
+        if len(np.unique(y_resampled[index])) < 2:
+            keep.append(index)
+            continue
+        # Same cleaning rule SMOTEENN applies, restricted to the chunk.
+        enn = EditedNearestNeighbours(sampling_strategy="all", n_jobs=n_jobs)
+        enn.fit_resample(X_resampled[index], y_resampled[index])
+        keep.append(index[enn.sample_indices_])
+    keep = np.sort(np.concatenate(keep))
+    return X_resampled[keep], y_resampled[keep]
+
+
+def _memory_mb(X: np.ndarray, y: np.ndarray) -> float:
+    return round((np.asarray(X).nbytes + y.nbytes) / 2**20, 2)
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS.
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 2**20 if sys.platform == "darwin" else max_rss / 2**10
+
+
+def _resample(strategy: str, X: np.ndarray, y: np.ndarray, random_state: int, enn_chunk_size: int, n_jobs: int) -> tuple:
+    """
+    Runs in the child process. Returns (X, y, seconds, peak_memory_mb).
+    """
+    baseline = _max_rss_mb()
+    start = time.perf_counter()
+    if strategy == "smoteenn":
+        X, y = SMOTEENN(random_state=random_state, n_jobs=n_jobs).fit_resample(X, y)
+    elif strategy == "chunked_enn":
+        X, y = chunked_smote_enn(X, y, enn_chunk_size, random_state=random_state, n_jobs=n_jobs)
+    elif strategy == "smote":
+        X, y = SMOTE(random_state=random_state).fit_resample(X, y)
+    elif strategy == "random_over":
+        X, y = RandomOverSampler(random_state=random_state).fit_resample(X, y)
+    elif strategy == "random_under":
+        X, y = RandomUnderSampler(random_state=random_state).fit_resample(X, y)
+    seconds = time.perf_counter() - start
+    return X, y, seconds, _max_rss_mb() - baseline
+
+
+def rebalance(strategy: str, X: np.ndarray, y: np.ndarray, random_state: int = 42,
+              enn_chunk_size: int = 50000, n_jobs: int = None) -> tuple:
+    """
+    Applies a rebalancing strategy. Returns (X, y, class_weight, report); class_weight is the value to
+    train the model with ("balanced" for the class_weight strategy, else None).
+    """
+    if strategy not in REBALANCE_STRATEGIES:
+        raise ValueError(f"Unknown rebalancing strategy {strategy!r}. Expected one of {REBALANCE_STRATEGIES}")
+    y = np.asarray(y)
+    report = {
+        "strategy": strategy,
+        "rows_before": int(len(y)),
+        "class_counts_before": _class_counts(y),
+        "memory_mb_before": _memory_mb(X, y)
+    }
+    class_weight = "balanced" if strategy == "class_weight" else None
+    elapsed, peak = 0.0, 0.0
+
+    if strategy in RESAMPLING_STRATEGIES:
+        # forkserver: the caller is a pipeline thread, and forking a process with running threads can deadlock.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("forkserver")) as executor:
+            X, y, elapsed, peak = executor.submit(_resample, strategy, np.asarray(X), y, random_state, enn_chunk_size, n_jobs).result()
+
+    report.update(
+        rows_after=int(len(y)),
+        class_counts_after=_class_counts(y),
+        class_weight=class_weight,
+        seconds=round(elapsed, 3),
+        peak_memory_mb=round(peak, 2),
+        memory_mb_after=_memory_mb(X, y)
+    )
+    return X, y, class_weight, report
@@ -1,11 +1,110 @@
 import boto3
-import os, yaml
+import os, json, hashlib, threading
+import yaml
 from botocore.exceptions import ClientError
 from .exception_handler import MyException
+from .logger import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+class S3ArtifactCache:
+    """
+    Content-addressed local cache of S3 objects, keyed by bucket, key and ETag, with an LRU size cap.
+
+    The last ETag seen for each (bucket, key) is kept in index.json. A cached object is revalidated
+    with a single conditional GET (If-None-Match); a 304 means the local copy is served as-is,
+    otherwise the new body is streamed to disk under its own ETag. Files are never rewritten in place,
+    so readers holding an older version (e.g. a memory-mapped model) are unaffected.
+    """
+    def __init__(self, s3_client, cache_dir: str = None, max_bytes: int = None):
+        self.s3 = s3_client
+        self.cache_dir = cache_dir or os.getenv("S3_CACHE_DIR", "artifacts/s3_cache")
+        self.max_bytes = max_bytes or int(os.getenv("S3_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+        self.objects_dir = os.path.join(self.cache_dir, "objects")
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self._lock = threading.Lock()
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    def _object_path(self, bucket: str, key: str, etag: str) -> str:
+        digest = hashlib.sha256(f"{bucket}/{key}@{etag}".encode()).hexdigest()
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self.index_path) as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _record_etag(self, bucket: str, key: str, etag: str):
+        with self._lock:
+            index = self._read_index()
+            index[f"{bucket}/{key}"] = etag
+            tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(index, file)
+            os.replace(tmp_path, self.index_path)
+
+    def fetch(self, bucket: str, key: str) -> str:
+        """
+        Returns a local path holding the current contents of s3://bucket/key.
+        """
+        cached_etag = self._read_index().get(f"{bucket}/{key}")
+        cached_path = self._object_path(bucket, key, cached_etag) if cached_etag else None
+        request = {"Bucket": bucket, "Key": key}
+        if cached_path and os.path.exists(cached_path):
+            request["IfNoneMatch"] = f'"{cached_etag}"'
+
+        try:
+            response = self.s3.get_object(**request)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("304", "NotModified"):
+                os.utime(cached_path)
+                logging.info(f"S3 cache hit for s3://{bucket}/{key} (etag {cached_etag})")
+                return cached_path
+            raise
+
+        etag = response["ETag"].strip('"')
+        local_path = self._object_path(bucket, key, etag)
+        if not os.path.exists(local_path):
+            os.makedirs(os.path.dirname(local_path), exist_ok=True)
+            tmp_path = f"{local_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as file:
+                for chunk in response["Body"].iter_chunks(chunk_size=1024 * 1024):
+                    file.write(chunk)
+            os.replace(tmp_path, local_path)
+            logging.info(f"S3 cache miss for s3://{bucket}/{key}, stored etag {etag}")
+        else:
+            response["Body"].close()
+            os.utime(local_path)
+        self._record_etag(bucket, key, etag)
+        self._evict(keep=local_path)
+        return local_path
+
+    def _evict(self, keep: str):
+        """
+        Deletes least recently used objects until the cache fits in max_bytes.
+        """
+        entries = []
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+            logging.info(f"Evicted {path} from S3 cache")
+
+
 class S3Operations:
     def __init__(self):
         self.s3 = boto3.client("s3")
@@ -14,6 +113,8 @@ class S3Operations:
         if not self.bucket:
             raise ValueError("AWS_S3_BUCKET_NAME environment variable not set")
 
+        self.cache = S3ArtifactCache(self.s3)
+
     def test_connection(self) -> bool:
         """Check if bucket is accessible"""
         try:
@@ -44,13 +145,10 @@ class S3Operations:
     def download_file(self, s3_key: str, local_path: str):
         self.s3.download_file(self.bucket, s3_key, local_path)
 
-    def load_metrics_from_s3(self,bucket, key):
-        s3 = boto3.client("s3")
-
-        obj = s3.get_object(
-            Bucket=bucket,
-            Key=key
-        )
+    def download_cached(self, s3_key: str, bucket: str = None) -> str:
+        """Return a local path for the object, downloading only if its ETag changed"""
+        return self.cache.fetch(bucket or self.bucket, s3_key)
 
-        content = obj["Body"].read()
-        return yaml.safe_load(content)
+    def load_metrics_from_s3(self,bucket, key):
+        with open(self.download_cached(key, bucket=bucket), "rb") as file:
+            return yaml.safe_load(file)
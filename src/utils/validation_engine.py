@@ -0,0 +1,170 @@
+"""
+Schema-driven, streaming data validation.
+
+SchemaValidator consumes a feature file chunk by chunk and checks every column with vectorized
+pandas/NumPy operations in a single pass. Per column it checks:
+    - dtype: int columns must hold integral numbers, float columns numbers, category columns strings
+    - null rate against max_null_rate
+    - categorical values against categorical_levels
+    - numeric values against numeric_ranges ([min, max], either bound may be null)
+It also checks that id_column has no duplicate ids. Summary statistics for every column are
+accumulated along the way and returned with the list of failed checks.
+"""
+import numpy as np
+import pandas as pd
+
+# Distinct invalid values kept per column for the report.
+MAX_EXAMPLES = 10
+
+
+class _ColumnProfile:
+    def __init__(self, name: str, kind: str, levels: list = None, value_range: list = None):
+        self.name = name
+        self.kind = kind
+        self.levels = levels
+        self.value_range = value_range or [None, None]
+        self.rows = 0
+        self.nulls = 0
+        self.bad_type = 0
+        self.invalid = 0
+        self.examples = set()
+        # Numeric moments, or level counts for categories.
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.level_counts = {}
+
+    def _remember(self, values):
+        if len(self.examples) < MAX_EXAMPLES:
+            self.examples.update(map(str, pd.unique(values)[:MAX_EXAMPLES - len(self.examples)]))
+
+    def update(self, series: pd.Series):
+        self.rows += len(series)
+        present = series.notna()
+        self.nulls += int((~present).sum())
+        series = series[present]
+
+        if self.kind == "category":
+            if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+                is_text = np.ones(len(series), dtype=bool)
+            elif series.dtype == object:
+                is_text = series.map(type).eq(str).to_numpy()
+            else:
+                is_text = np.zeros(len(series), dtype=bool)
+            self.bad_type += int((~is_text).sum())
+            values = series[is_text]
+            if self.levels is not None:
+                unknown = ~values.isin(self.levels).to_numpy()
+                self.invalid += int(unknown.sum())
+                self._remember(values[unknown])
+            for level, count in values.value_counts().items():
+                self.level_counts[level] = self.level_counts.get(level, 0) + int(count)
+            return
+
+        numbers = pd.to_numeric(series, errors="coerce").astype("float64").to_numpy()
+        not_numeric = np.isnan(numbers)
+        if self.kind == "int":
+            not_numeric |= np.mod(numbers, 1) != 0
+        self.bad_type += int(not_numeric.sum())
+        if not_numeric.any():
+            self._remember(series[not_numeric])
+        numbers = numbers[~not_numeric]
+        series = series[~not_numeric]
+        if not len(numbers):
+            return
+
+        low, high = self.value_range
+        out_of_range = np.zeros(len(numbers), dtype=bool)
+        if low is not None:
+            out_of_range |= numbers < low
+        if high is not None:
+            out_of_range |= numbers > high
+        self.invalid += int(out_of_range.sum())
+        if out_of_range.any():
+            self._remember(series[out_of_range])
+
+        self.minimum = min(self.minimum, float(numbers.min()))
+        self.maximum = max(self.maximum, float(numbers.max()))
+        self.total += float(numbers.sum())
+        self.total_sq += float(np.square(numbers).sum())
+
+    def summary(self) -> dict:
+        summary = {
+            "dtype": self.kind,
+            "rows": self.rows,
+            "nulls": self.nulls,
+            "null_rate": self.nulls / self.rows if self.rows else 0.0,
+            "bad_type": self.bad_type,
+            "invalid": self.invalid
+        }
+        if self.examples:
+            summary["invalid_examples"] = sorted(self.examples)
+        if self.kind == "category":
+            summary["levels"] = dict(sorted(self.level_counts.items()))
+            return summary
+
+        count = self.rows - self.nulls - self.bad_type
+        if count:
+            mean = self.total / count
+            summary.update(
+                min=self.minimum,
+                max=self.maximum,
+                mean=mean,
+                std=float(np.sqrt(max(self.total_sq / count - mean * mean, 0.0)))
+            )
+        return summary
+
+
+class SchemaValidator:
+    """
+    Streaming validator for one feature file. Call update() with each chunk, then result().
+    """
+    def __init__(self, schema: dict):
+        columns = [list(column.items())[0] for column in schema["columns"]]
+        levels = schema.get("categorical_levels") or {}
+        ranges = schema.get("numeric_ranges") or {}
+        self.max_null_rate = schema.get("max_null_rate", 0.0)
+        self.id_column = schema.get("id_column")
+        self.profiles = {
+            name: _ColumnProfile(name, kind, levels.get(name), ranges.get(name))
+            for name, kind in columns
+        }
+        self._ids = []
+
+    def update(self, df: pd.DataFrame):
+        for name, profile in self.profiles.items():
+            if name in df.columns:
+                profile.update(df[name])
+        if self.id_column in df.columns:
+            ids = pd.to_numeric(df[self.id_column], errors="coerce").dropna()
+            self._ids.append(ids.to_numpy(dtype="int64"))
+
+    def ids(self) -> np.ndarray:
+        """
+        Unique ids seen so far, sorted.
+        """
+        return np.unique(np.concatenate(self._ids)) if self._ids else np.empty(0, dtype="int64")
+
+    def result(self) -> tuple:
+        """
+        Returns (errors, stats): a list of failed check messages and per-column summary statistics.
+        """
+        errors = []
+        stats = {name: profile.summary() for name, profile in self.profiles.items()}
+        for name, summary in stats.items():
+            if summary["null_rate"] > self.max_null_rate:
+                errors.append(f"{name}: null rate {summary['null_rate']:.4f} exceeds {self.max_null_rate}")
+            if summary["bad_type"]:
+                errors.append(f"{name}: {summary['bad_type']} values are not of type {summary['dtype']}")
+            if summary["invalid"]:
+                check = "unknown levels" if summary["dtype"] == "category" else "values out of range"
+                errors.append(f"{name}: {summary['invalid']} {check} e.g. {summary.get('invalid_examples')}")
+
+        if self._ids:
+            total = sum(len(ids) for ids in self._ids)
+            duplicates = total - len(self.ids())
+            stats[self.id_column]["duplicates"] = duplicates
+            if duplicates:
+                errors.append(f"{self.id_column}: {duplicates} duplicate ids")
+        return errors, stats
@@ -1,10 +1,21 @@
 #!/bin/sh
 #start fastapi
 echo "Starting FastAPI..."
-uvicorn api:app --host 0.0.0.0 --port 8000 &
+API_WORKERS=${API_WORKERS:-1}
+if [ "$API_WORKERS" -gt 1 ]; then
+    # Multi-worker mode: publish the production model once as memory-mapped arrays that all
+    # workers share. To roll out a newer model later, rerun the publish command (or call
+    # POST /model/reload on any worker); workers follow the new release within
+    # PREDICTION_SHARED_MODEL_POLL_SECONDS. See src/pipeline/shared_model_store.py.
+    export PREDICTION_SHARED_MODEL_DIR=${PREDICTION_SHARED_MODEL_DIR:-artifacts/shared_models}
+    python -m src.pipeline.shared_model_store publish
+    uvicorn api:app --host 0.0.0.0 --port 8000 --workers "$API_WORKERS" &
+else
+    uvicorn api:app --host 0.0.0.0 --port 8000 &
+fi
 
 #start streamlit application
 echo "Starting Streamlit..."
 streamlit run app.py --server.port 8501 --server.address 0.0.0.0
 
-echo "Streamlit exited"
\ No newline at end of file
+echo "Streamlit exited"
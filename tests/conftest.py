@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler, MinMaxScaler, OneHotEncoder
+
+
+def make_df(n: int = 2000, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic rows with the columns of config/schema.yaml.
+    """
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(1, n + 1),
+        "Gender": rng.choice(["Male", "Female"], n),
+        "Age": rng.integers(18, 85, n),
+        "Driving_License": rng.integers(0, 2, n),
+        "Region_Code": rng.integers(0, 52, n).astype(float),
+        "Previously_Insured": rng.integers(0, 2, n),
+        "Vehicle_Age": rng.choice(["< 1 Year", "1-2 Year", "> 2 Years"], n),
+        "Vehicle_Damage": rng.choice(["Yes", "No"], n),
+        "Annual_Premium": rng.uniform(2000, 60000, n).round(1),
+        "Policy_Sales_Channel": rng.integers(1, 160, n).astype(float),
+        "Vintage": rng.integers(10, 300, n),
+        "Response": (rng.random(n) < 0.3).astype(int),
+    })
+
+
+@pytest.fixture
+def fitted_model():
+    """
+    Returns (preprocessor, forest, df) fitted on make_df().
+    """
+    df = make_df()
+    preprocessor = ColumnTransformer([
+        ("num", StandardScaler(), ["Age", "Vintage"]),
+        ("mm", MinMaxScaler(), ["Annual_Premium"]),
+        ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), ["Gender", "Vehicle_Age", "Vehicle_Damage"]),
+        ("drop", "drop", ["id"])
+    ], remainder="passthrough")
+    X = preprocessor.fit_transform(df.drop(columns="Response"))
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0).fit(X, df["Response"])
+    return preprocessor, model, df
@@ -0,0 +1,54 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+import src.utils.bulk_loader as bulk_loader
+from src.utils.mongo_helper import push_data_to_mongo
+from conftest import make_df
+
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+    """
+    Returns (data_path, collection, upsert flags of every chunk write).
+    """
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(bulk_loader, "connect_to_mongo", lambda: client)
+    monkeypatch.setenv("DB_NAME", "test-db")
+    monkeypatch.setenv("COLLECTION_NAME", "test-collection")
+    data_path = tmp_path / "data.csv"
+    make_df(500).to_csv(data_path, index=False)
+
+    upserts = []
+    write_chunk = bulk_loader._write_chunk
+
+    def recording_write_chunk(collection, records, upsert, key):
+        upserts.append(upsert)
+        # mongomock's bulk_write does not accept pymongo's ReplaceOne, so both modes insert here.
+        return write_chunk(collection, records, False, key)
+
+    monkeypatch.setattr(bulk_loader, "_write_chunk", recording_write_chunk)
+    return str(data_path), client["test-db"]["test-collection"], upserts
+
+
+@pytest.mark.parametrize("env, expected", [("true", True), ("false", False)])
+def test_push_data_to_mongo_follows_mongo_bulk_upsert(loader, monkeypatch, env, expected):
+    data_path, collection, upserts = loader
+    monkeypatch.setenv("MONGO_BULK_UPSERT", env)
+
+    stats = push_data_to_mongo(data_path)
+
+    assert stats["rows"] == 500
+    assert collection.count_documents({}) == 500
+    assert set(upserts) == {expected}
+    assert ("id_1" in collection.index_information()) == expected
+
+
+def test_push_data_to_mongo_explicit_upsert_overrides_env(loader, monkeypatch):
+    data_path, collection, upserts = loader
+    monkeypatch.setenv("MONGO_BULK_UPSERT", "true")
+
+    push_data_to_mongo(data_path, upsert=False)
+
+    assert set(upserts) == {False}
+    assert list(collection.index_information()) == ["_id_"]
@@ -0,0 +1,103 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+bson = pytest.importorskip("bson")
+
+import src.components.data_ingestion as data_ingestion
+from src.components.data_ingestion import DataIngestion
+from src.utils.common import read_feature_table
+from conftest import make_df
+
+
+@pytest.fixture
+def collection(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_ROOT_DIR", str(tmp_path))
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(data_ingestion, "connect_to_mongo", lambda: client)
+    return client["test-db"]["test-collection"]
+
+
+@pytest.mark.parametrize("split_method", ["range", "sample"])
+def test_partitioned_export_keeps_every_document(collection, monkeypatch, split_method):
+    monkeypatch.setenv("DATA_INGESTION_DB_NAME", "test-db")
+    monkeypatch.setenv("DATA_INGESTION_COLLECTION_NAME", "test-collection")
+    monkeypatch.setenv("DATA_INGESTION_PARTITIONS", "4")
+    monkeypatch.setenv("DATA_INGESTION_SPLIT_METHOD", split_method)
+    monkeypatch.setenv("DATA_INGESTION_BATCH_SIZE", "100")
+    records = make_df(1000).to_dict("records")
+    for record in records[:5]:
+        record["id"] = None
+    for record in records[5:10]:
+        del record["id"]
+    collection.insert_many(records)
+
+    ingestion = DataIngestion()
+    df = read_feature_table(ingestion.export_data_to_feature_store())
+
+    assert len(df) == len(records)
+    ids = df["id"].dropna()
+    assert len(ids) == len(records) - 10
+    assert ids.is_unique
+    assert set(ids) == set(range(11, 1001))
+
+
+def test_incremental_run_on_empty_collection_fails_clearly(collection, monkeypatch):
+    monkeypatch.setenv("DATA_INGESTION_DB_NAME", "test-db")
+    monkeypatch.setenv("DATA_INGESTION_COLLECTION_NAME", "test-collection")
+    monkeypatch.setenv("DATA_INGESTION_MODE", "incremental")
+    ingestion = DataIngestion()
+
+    with pytest.raises(Exception, match="is empty"):
+        ingestion.run()
+    assert not ingestion.read_incremental_state()["runs"]
+
+
+@pytest.mark.parametrize("split_method", ["range", "sample"])
+def test_partitioned_export_by_object_id(collection, monkeypatch, split_method):
+    monkeypatch.setenv("DATA_INGESTION_DB_NAME", "test-db")
+    monkeypatch.setenv("DATA_INGESTION_COLLECTION_NAME", "test-collection")
+    monkeypatch.setenv("DATA_INGESTION_PARTITIONS", "4")
+    monkeypatch.setenv("DATA_INGESTION_PARTITION_FIELD", "_id")
+    monkeypatch.setenv("DATA_INGESTION_SPLIT_METHOD", split_method)
+    monkeypatch.setenv("DATA_INGESTION_BATCH_SIZE", "100")
+    records = make_df(1000).to_dict("records")
+    collection.insert_many(records)
+
+    ingestion = DataIngestion()
+    bounds = ingestion.compute_split_points(collection)
+    assert all(isinstance(bound, bson.ObjectId) for bound in bounds)
+    assert len(bounds) == 5
+    df = read_feature_table(ingestion.export_data_to_feature_store())
+
+    assert len(df) == len(records)
+    assert df["id"].is_unique
+    assert set(df["id"]) == set(range(1, 1001))
+
+
+def test_incremental_split_handles_missing_and_string_ids(collection, monkeypatch):
+    monkeypatch.setenv("DATA_INGESTION_DB_NAME", "test-db")
+    monkeypatch.setenv("DATA_INGESTION_COLLECTION_NAME", "test-collection")
+    monkeypatch.setenv("DATA_INGESTION_MODE", "incremental")
+    monkeypatch.setenv("DATA_INGESTION_WATERMARK_FIELD", "Vintage")
+    records = make_df(500).to_dict("records")
+    for record in records[:20]:
+        record["id"] = None
+    collection.insert_many(records)
+
+    artifact = DataIngestion().run()
+    train, test = read_feature_table(artifact.train_file_path), read_feature_table(artifact.test_file_path)
+    assert len(train) + len(test) == len(records)
+    assert train["id"].isna().sum() + test["id"].isna().sum() == 20
+    assert 0 < len(test) < len(records) / 4
+
+
+def test_test_rows_are_stable_for_integer_and_string_ids(tmp_path, monkeypatch):
+    import pandas as pd
+    monkeypatch.setenv("DATA_ROOT_DIR", str(tmp_path))
+    ingestion = DataIngestion()
+    ids = pd.Series(range(1, 5001), dtype="Int64")
+    mask = ingestion.is_test_row(ids)
+    assert (mask == ingestion.is_test_row(ids.astype("float64"))).all()
+    assert (mask[:100] == ingestion.is_test_row(ids[:100])).all()
+    strings = ingestion.is_test_row(ids.astype(str).radd("policy-"))
+    assert 0.05 < strings.mean() < 0.15
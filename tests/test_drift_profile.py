@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from src.components.data_drift import DataDrift
+from src.entity import DataIngestionArtifact
+from src.utils.drift_profile import ProfileBuilder
+
+
+def binary_frame(n: int, share_of_ones: float, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"Driving_License": (rng.random(n) < share_of_ones).astype(int)})
+
+
+def profile_and_drift(reference_df: pd.DataFrame, current_df: pd.DataFrame) -> dict:
+    reference_builder = ProfileBuilder(["Driving_License"], [])
+    reference_builder.update(reference_df)
+    builder = ProfileBuilder(["Driving_License"], [], reference=reference_builder.profile())
+    builder.update(current_df)
+    return builder.drift()["Driving_License"]
+
+
+def test_binary_column_shift_is_detected():
+    drift = profile_and_drift(binary_frame(50000, 0.998, 0), binary_frame(50000, 0.5, 1))
+    assert drift["psi"] > 0.2
+    assert drift["ks"] > 0.1
+
+
+def test_binary_column_without_shift_is_stable():
+    drift = profile_and_drift(binary_frame(50000, 0.998, 0), binary_frame(50000, 0.998, 1))
+    assert drift["psi"] < 0.01
+    assert drift["ks"] < 0.01
+
+
+def test_reference_profiles_without_closed_field_keep_right_closed_bins():
+    reference = {"Driving_License": {"kind": "numeric", "cuts": [1.0], "shares": [1.0, 0.0]}}
+    builder = ProfileBuilder(["Driving_License"], [], reference=reference)
+    builder.update(pd.DataFrame({"Driving_License": [0, 1, 1, 1]}))
+    assert builder.drift()["Driving_License"]["psi"] == 0.0
+
+
+def test_target_is_not_a_drift_feature(monkeypatch):
+    monkeypatch.setenv("TARGET_COLUMN", "Response")
+    numeric_columns, categorical_columns = DataDrift(DataIngestionArtifact("run", "train.parquet", "test.parquet")).feature_columns()
+    assert "Response" not in numeric_columns + categorical_columns
+    assert "Driving_License" in numeric_columns
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.pipeline.feature_encoder import CompiledFeatureEncoder
+from src.utils.common import write_yaml_file
+
+
+def _encoder(preprocessor, tmp_path):
+    columns_file_path = str(tmp_path / "columns.yaml")
+    write_yaml_file(columns_file_path, {"transformed_columns": preprocessor.get_feature_names_out().tolist()})
+    return CompiledFeatureEncoder.from_preprocessor(preprocessor, columns_file_path)
+
+
+def test_encoder_matches_preprocessor_transform(tmp_path, fitted_model):
+    preprocessor, _, df = fitted_model
+    encoder = _encoder(preprocessor, tmp_path)
+    features = df.drop(columns="Response")
+
+    expected = preprocessor.transform(features.iloc[:200])
+    encoded = np.vstack([encoder.encode(record).copy() for record in features.iloc[:200].to_dict("records")])
+
+    assert encoder.feature_names == preprocessor.get_feature_names_out().tolist()
+    np.testing.assert_array_equal(encoded, expected)
+
+
+def test_encoder_matches_on_unknown_categories(tmp_path, fitted_model):
+    preprocessor, _, df = fitted_model
+    encoder = _encoder(preprocessor, tmp_path)
+    features = df.drop(columns="Response").iloc[:20].copy()
+    features["Gender"] = "Unknown"
+    features["Vehicle_Age"] = ["> 9 Years", "1-2 Year"] * 10
+
+    expected = preprocessor.transform(features)
+    encoded = np.vstack([encoder.encode(record).copy() for record in features.to_dict("records")])
+
+    np.testing.assert_array_equal(encoded, expected)
+    assert encoder.verify(preprocessor)
+
+
+def test_encoder_rejects_a_different_column_ordering(tmp_path, fitted_model):
+    preprocessor, _, _ = fitted_model
+    columns_file_path = str(tmp_path / "columns.yaml")
+    write_yaml_file(columns_file_path, {"transformed_columns": preprocessor.get_feature_names_out().tolist()[::-1]})
+
+    with pytest.raises(ValueError, match="Column ordering"):
+        CompiledFeatureEncoder.from_preprocessor(preprocessor, columns_file_path)
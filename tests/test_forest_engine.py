@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, HistGradientBoostingClassifier
+from src.pipeline.forest_engine import FlatForest
+from src.utils.mmap_artifact import save_mmap_object, load_mmap_object
+
+
+def _inputs(preprocessor, df, forest):
+    real = preprocessor.transform(df.drop(columns="Response"))
+    return np.vstack([real, forest.sample_inputs()])
+
+
+def test_predict_proba_matches_sklearn(fitted_model):
+    preprocessor, model, df = fitted_model
+    forest = FlatForest.from_sklearn(model)
+    X = _inputs(preprocessor, df, forest)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+    # Chunking must not change the result.
+    np.testing.assert_array_equal(forest.predict_proba(X, chunk_size=7), forest.predict_proba(X))
+    assert forest.verify(model, X)
+
+
+def test_extra_trees_match_sklearn(fitted_model):
+    preprocessor, _, df = fitted_model
+    X = preprocessor.transform(df.drop(columns="Response"))
+    model = ExtraTreesClassifier(n_estimators=10, random_state=0).fit(X, df["Response"])
+    forest = FlatForest.from_sklearn(model)
+
+    np.testing.assert_allclose(forest.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-9)
+
+
+def test_rejects_non_forest_models(fitted_model):
+    preprocessor, _, df = fitted_model
+    model = HistGradientBoostingClassifier(max_iter=5).fit(preprocessor.transform(df.drop(columns="Response")), df["Response"])
+    with pytest.raises(TypeError):
+        FlatForest.from_sklearn(model)
+
+
+@pytest.mark.parametrize("round_trip", ["npy_directory", "mmap_artifact"])
+def test_mapped_forest_round_trip(tmp_path, fitted_model, round_trip):
+    preprocessor, model, df = fitted_model
+    forest = FlatForest.from_sklearn(model)
+    if round_trip == "npy_directory":
+        forest.save(str(tmp_path / "forest"))
+        loaded = FlatForest.load(str(tmp_path / "forest"), mmap_mode="r")
+        assert isinstance(loaded.threshold, np.memmap)
+    else:
+        save_mmap_object(str(tmp_path / "forest.mmap"), forest)
+        loaded = load_mmap_object(str(tmp_path / "forest.mmap"))
+    assert not loaded.threshold.flags.writeable
+    assert (loaded.max_depth, loaded.n_estimators, loaded.n_features_in_) == (forest.max_depth, forest.n_estimators, forest.n_features_in_)
+
+    X = _inputs(preprocessor, df, forest)
+    np.testing.assert_array_equal(loaded.predict_proba(X), forest.predict_proba(X))
+    np.testing.assert_array_equal(loaded.classes_, model.classes_)
@@ -0,0 +1,13 @@
+import numpy as np
+from src.components import hyperparameter_search
+
+
+def test_worker_arrays_are_memory_mapped(tmp_path):
+    paths = []
+    for name, array in [("X", np.ones((100, 3))), ("y", np.zeros(100)), ("vX", np.ones((20, 3))), ("vy", np.zeros(20))]:
+        paths.append(str(tmp_path / f"{name}.npy"))
+        np.save(paths[-1], array)
+    hyperparameter_search._open_shared_arrays(*paths)
+    shared = hyperparameter_search._shared
+    for array in (shared["X"], shared["y"], *shared["validation"]):
+        assert isinstance(array, np.memmap)
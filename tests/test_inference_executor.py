@@ -0,0 +1,70 @@
+import asyncio
+import threading
+import pytest
+from src.pipeline.inference_executor import BoundedInferenceExecutor, ExecutorSaturatedError
+
+
+def test_admits_up_to_workers_plus_queue_then_rejects():
+    executor = BoundedInferenceExecutor(kind="thread", max_workers=2, max_queue_size=1)
+    release = threading.Event()
+
+    async def scenario():
+        admitted = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        stats = executor.stats()
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.run(release.wait)
+        release.set()
+        await asyncio.gather(*admitted)
+        return stats
+
+    try:
+        busy = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    assert busy["in_flight"] == 3
+    assert busy["queued"] == 1
+    stats = executor.stats()
+    assert stats["in_flight"] == 0
+    assert stats["peak_in_flight"] == 3
+    assert stats["completed"] == 3
+    assert stats["rejected"] == 1
+    assert stats["failed"] == 0
+    assert stats["mean_latency_ms"] > 0
+
+
+def test_failed_calls_release_their_slot():
+    executor = BoundedInferenceExecutor(kind="thread", max_workers=1, max_queue_size=0)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await executor.run(fail)
+        return await executor.run(sum, [1, 2])
+
+    try:
+        assert asyncio.run(scenario()) == 3
+    finally:
+        executor.shutdown()
+    stats = executor.stats()
+    assert (stats["failed"], stats["completed"], stats["in_flight"]) == (1, 1, 0)
+
+
+def test_saturation_returns_503():
+    TestClient = pytest.importorskip("fastapi.testclient").TestClient
+    from fastapi import FastAPI
+    from api import executor_saturated_handler
+
+    app = FastAPI()
+    app.add_exception_handler(ExecutorSaturatedError, executor_saturated_handler)
+
+    @app.get("/busy")
+    def busy():
+        raise ExecutorSaturatedError("Inference executor saturated (1/1 in flight)")
+
+    response = TestClient(app).get("/busy")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert "saturated" in response.json()["detail"]
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import pytest
+from src.pipeline.micro_batcher import MicroBatcher
+from src.pipeline.inference_executor import BoundedInferenceExecutor, ExecutorSaturatedError
+
+
+class RecordingPipeline:
+    """
+    Stands in for PredictionPipeline; remembers every record it scores.
+    """
+    def __init__(self):
+        self.records = []
+        self.batches = []
+
+    def predict_batch(self, records, chunk_size=None):
+        self.batches.append(len(records))
+        self.records.extend(records)
+        return [{"prediction": record["n"]} for record in records]
+
+
+def test_saturated_executor_rejects_before_batching():
+    pipeline = RecordingPipeline()
+    batcher = MicroBatcher(lambda: pipeline, max_batch_size=8, max_wait_ms=1)
+    executor = BoundedInferenceExecutor(kind="thread", max_workers=1, max_queue_size=0)
+    release = threading.Event()
+    batcher.start()
+
+    async def scenario():
+        # Occupies the only slot until released.
+        busy = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorSaturatedError):
+            await executor.wait(batcher.submit, {"n": 1})
+        release.set()
+        await busy
+        return await executor.wait(batcher.submit, {"n": 2})
+
+    try:
+        assert asyncio.run(scenario()) == {"prediction": 2}
+    finally:
+        batcher.stop()
+        executor.shutdown()
+    assert pipeline.records == [{"n": 2}]
+    assert executor.stats()["rejected"] == 1
+
+
+def test_full_queue_raises_saturated():
+    pipeline = RecordingPipeline()
+    # Not started, so nothing drains the queue.
+    batcher = MicroBatcher(lambda: pipeline, max_queue_size=2)
+    batcher.submit({"n": 1})
+    batcher.submit({"n": 2})
+    with pytest.raises(ExecutorSaturatedError):
+        batcher.submit({"n": 3})
+    assert batcher.stats()["rejected"] == 1
+
+    batcher.start()
+    batcher.stop()
+    assert pipeline.records == [{"n": 1}, {"n": 2}]
+
+
+def test_flushes_full_batches_and_fans_results_out():
+    pipeline = RecordingPipeline()
+    # Long wait: batches are only cut by size.
+    batcher = MicroBatcher(lambda: pipeline, max_batch_size=4, max_wait_ms=10000)
+    futures = [batcher.submit({"n": n}) for n in range(8)]
+    batcher.start()
+    try:
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.stop()
+    assert results == [{"prediction": n} for n in range(8)]
+    assert pipeline.batches == [4, 4]
+    stats = batcher.stats()
+    assert (stats["batches"], stats["rows"], stats["mean_batch_size"]) == (2, 8, 4.0)
+    assert stats["batch_size_histogram"] == {"3-4": 2}
+
+
+def test_flushes_partial_batch_after_max_wait():
+    pipeline = RecordingPipeline()
+    batcher = MicroBatcher(lambda: pipeline, max_batch_size=64, max_wait_ms=20)
+    batcher.start()
+    try:
+        assert batcher.predict({"n": 7}) == {"prediction": 7}
+    finally:
+        batcher.stop()
+    assert pipeline.batches == [1]
+
+
+def test_batch_errors_reach_every_caller():
+    class FailingPipeline:
+        def predict_batch(self, records, chunk_size=None):
+            raise ValueError("bad batch")
+
+    batcher = MicroBatcher(FailingPipeline, max_batch_size=2, max_wait_ms=10000)
+    futures = [batcher.submit({"n": n}) for n in range(2)]
+    batcher.start()
+    try:
+        for future in futures:
+            with pytest.raises(ValueError, match="bad batch"):
+                future.result(timeout=5)
+    finally:
+        batcher.stop()
+    assert batcher.stats()["errors"] == 1
+
+
+@pytest.mark.parametrize("size, bucket", [(1, "1"), (2, "2"), (3, "3-4"), (4, "3-4"), (5, "5-8"), (64, "33-64")])
+def test_batch_size_buckets(size, bucket):
+    assert MicroBatcher._bucket(size) == bucket
@@ -0,0 +1,74 @@
+import mmap
+import numpy as np
+from src.utils.mmap_artifact import save_mmap_object, load_mmap_object, MIN_MAPPED_BYTES
+from src.pipeline.forest_engine import FlatForest
+
+
+def _mapping(array: np.ndarray):
+    """
+    Follows .base to the object owning the memory; the mmap for arrays backed by the mapping.
+    """
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return base.obj if isinstance(base, memoryview) else base
+
+
+def test_flat_forest_arrays_are_views_onto_the_mapping(tmp_path, fitted_model):
+    _, model, _ = fitted_model
+    forest = FlatForest.from_sklearn(model)
+    save_mmap_object(str(tmp_path / "forest.mmap"), forest)
+    loaded = load_mmap_object(str(tmp_path / "forest.mmap"))
+
+    mapped = [name for name in FlatForest.ARRAY_NAMES if getattr(forest, name).nbytes >= MIN_MAPPED_BYTES]
+    assert {"threshold", "children", "leaf_values"} <= set(mapped)
+    buffer = _mapping(loaded.threshold)
+    assert isinstance(buffer, mmap.mmap)
+    whole_file = np.frombuffer(buffer, dtype=np.uint8)
+    for name in mapped:
+        array = getattr(loaded, name)
+        assert not array.flags.writeable
+        assert np.shares_memory(array, whole_file)
+        np.testing.assert_array_equal(array, getattr(forest, name))
+
+
+def test_sklearn_trees_copy_their_arrays(tmp_path, fitted_model):
+    _, model, _ = fitted_model
+    save_mmap_object(str(tmp_path / "model.mmap"), model)
+    loaded = load_mmap_object(str(tmp_path / "model.mmap"))
+
+    value = loaded.estimators_[0].tree_.value
+    # Tree.__setstate__ copies node and value arrays into memory the Tree owns.
+    assert value.flags.writeable
+    assert not isinstance(_mapping(value), mmap.mmap)
+    np.testing.assert_array_equal(value, model.estimators_[0].tree_.value)
+
+
+def test_flat_backend_loads_the_model_only_for_large_batches(tmp_path, monkeypatch, fitted_model):
+    from src.pipeline import prediction
+    preprocessor, model, df = fitted_model
+    save_mmap_object(str(tmp_path / "model.mmap"), model)
+    save_mmap_object(str(tmp_path / "preprocessor.mmap"), preprocessor)
+    save_mmap_object(str(tmp_path / "forest.mmap"), FlatForest.from_sklearn(model))
+    downloads = []
+
+    class LocalRegistry:
+        def download_cached(self, s3_key):
+            downloads.append(s3_key.rsplit("/", 1)[-1])
+            return str(tmp_path / downloads[-1])
+
+    monkeypatch.setattr(prediction, "S3Operations", LocalRegistry)
+    monkeypatch.setenv("AWS_S3_BUCKET_NAME", "bucket")
+    monkeypatch.setenv("PREDICTION_ARTIFACT_FORMAT", "mmap")
+    monkeypatch.setenv("PREDICTION_INFERENCE_BACKEND", "flat")
+    monkeypatch.setenv("PREDICTION_FLAT_FOREST_MAX_BATCH", "10")
+    pipeline = prediction.PredictionPipeline(model_name="model", version="production", use_shared_store=False)
+    assert sorted(downloads) == ["forest.mmap", "preprocessor.mmap"]
+
+    records = df.drop(columns="Response").to_dict(orient="records")
+    small = pipeline.predict_batch(records[:5])
+    assert "model.mmap" not in downloads
+    large = pipeline.predict_batch(records[:50])
+    assert downloads.count("model.mmap") == 1
+    expected = model.predict_proba(preprocessor.transform(df.drop(columns="Response").iloc[:50]))[:, 1]
+    np.testing.assert_allclose([result["probability"] for result in small + large], np.concatenate([expected[:5], expected]))
@@ -0,0 +1,41 @@
+import threading
+import joblib
+from src.components import model_pusher
+from src.entity import DataTransformationArtifact, ModelEvaluationArtifact, ModelTrainingArtifact
+
+
+class RecordingS3:
+    """
+    Stands in for S3Operations; records upload keys in completion order. No versions exist yet.
+    """
+    def __init__(self):
+        self.keys = []
+        self._lock = threading.Lock()
+
+    def upload_file(self, local_path, s3_key):
+        with self._lock:
+            self.keys.append(s3_key)
+
+
+def test_version_is_uploaded_before_production(tmp_path, monkeypatch, fitted_model):
+    preprocessor, model, _ = fitted_model
+    model_path, preprocessor_path, metrics_path = (str(tmp_path / name) for name in ("model.pkl", "preprocessor.pkl", "metrics.yaml"))
+    joblib.dump(model, model_path)
+    joblib.dump(preprocessor, preprocessor_path)
+    open(metrics_path, "w").write("F1_Score: 0.5\n")
+    monkeypatch.setattr(model_pusher, "S3Operations", RecordingS3)
+    monkeypatch.setenv("MODEL_NAME", "model")
+
+    pusher = model_pusher.ModelPusher()
+    pusher.run(
+        ModelEvaluationArtifact(push_model=True, trained_model_path=model_path, best_model_metric=0.5),
+        DataTransformationArtifact(None, None, None, None, preprocessor_path),
+        ModelTrainingArtifact(model_path, metrics_path)
+    )
+
+    keys = pusher.s3.keys
+    version = [index for index, key in enumerate(keys) if "/v1/" in key]
+    production = [index for index, key in enumerate(keys) if "/production/" in key]
+    assert len(version) == len(production) == 6
+    assert max(version) < min(production)
+    assert keys[-1] == "models/registry/model/production/metrics.yaml"
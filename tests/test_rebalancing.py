@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+from src.utils.rebalancing import rebalance
+
+
+def _data(n=40000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 20)).astype(np.float32)
+    y = (rng.random(n) < 0.1).astype(np.int8)
+    return X, y
+
+
+@pytest.mark.parametrize("strategy", ["random_over", "smote"])
+def test_resampling_reports_peak_memory_of_the_strategy(strategy):
+    X, y = _data()
+    X_out, y_out, class_weight, report = rebalance(strategy, X, y)
+    assert class_weight is None
+    assert len(y_out) == report["rows_after"] > len(y)
+    # The resampled matrix is built inside the measured child process.
+    assert report["peak_memory_mb"] >= X_out.nbytes / 2**20 * 0.5
+    assert report["seconds"] > 0
+
+
+def test_class_weight_does_not_resample():
+    X, y = _data(1000)
+    X_out, y_out, class_weight, report = rebalance("class_weight", X, y)
+    assert X_out is X and class_weight == "balanced"
+    assert report["peak_memory_mb"] == 0.0
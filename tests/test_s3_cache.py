@@ -0,0 +1,92 @@
+import os
+import boto3
+import pytest
+import yaml
+from botocore.exceptions import ClientError
+
+moto = pytest.importorskip("moto")
+
+from src.utils.s3_operations import S3ArtifactCache, S3Operations
+
+BUCKET = "test-bucket"
+
+
+class RecordingClient:
+    """
+    Wraps an S3 client and records whether each get_object was answered with 304 Not Modified.
+    """
+    def __init__(self, client):
+        self.client = client
+        self.responses = []
+
+    def get_object(self, **request):
+        try:
+            response = self.client.get_object(**request)
+        except ClientError as e:
+            self.responses.append(e.response["Error"]["Code"])
+            raise
+        self.responses.append("200")
+        return response
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+def test_hit_on_not_modified_and_refetch_on_new_etag(s3, tmp_path):
+    client = RecordingClient(s3)
+    cache = S3ArtifactCache(client, cache_dir=str(tmp_path), max_bytes=1024 ** 2)
+    s3.put_object(Bucket=BUCKET, Key="models/model.pkl", Body=b"first")
+
+    first_path = cache.fetch(BUCKET, "models/model.pkl")
+    assert cache.fetch(BUCKET, "models/model.pkl") == first_path
+    assert client.responses[-1] == "304"
+
+    s3.put_object(Bucket=BUCKET, Key="models/model.pkl", Body=b"second")
+    second_path = cache.fetch(BUCKET, "models/model.pkl")
+    assert client.responses[-1] == "200"
+    assert second_path != first_path
+    with open(second_path, "rb") as file:
+        assert file.read() == b"second"
+    # The old version is left in place for readers that still hold it.
+    with open(first_path, "rb") as file:
+        assert file.read() == b"first"
+
+
+def test_evicts_least_recently_used(s3, tmp_path):
+    cache = S3ArtifactCache(s3, cache_dir=str(tmp_path), max_bytes=250)
+    for key in ("a", "b", "c"):
+        s3.put_object(Bucket=BUCKET, Key=key, Body=key.encode() * 100)
+
+    path_a = cache.fetch(BUCKET, "a")
+    path_b = cache.fetch(BUCKET, "b")
+    os.utime(path_a, (1, 1))
+    os.utime(path_b, (2, 2))
+    # A cache hit refreshes a, leaving b as the least recently used.
+    assert cache.fetch(BUCKET, "a") == path_a
+    path_c = cache.fetch(BUCKET, "c")
+
+    assert os.path.exists(path_a)
+    assert not os.path.exists(path_b)
+    assert os.path.exists(path_c)
+
+
+def test_load_metrics_follows_updates(s3, tmp_path, monkeypatch):
+    monkeypatch.setenv("AWS_S3_BUCKET_NAME", BUCKET)
+    monkeypatch.setenv("S3_CACHE_DIR", str(tmp_path))
+    operations = S3Operations()
+    key = "models/registry/model/production/metrics.yaml"
+
+    s3.put_object(Bucket=BUCKET, Key=key, Body=yaml.dump({"Accuracy": 0.8}))
+    assert operations.load_metrics_from_s3(BUCKET, key) == {"Accuracy": 0.8}
+    assert operations.load_metrics_from_s3(BUCKET, key) == {"Accuracy": 0.8}
+
+    s3.put_object(Bucket=BUCKET, Key=key, Body=yaml.dump({"Accuracy": 0.9}))
+    assert operations.load_metrics_from_s3(BUCKET, key) == {"Accuracy": 0.9}
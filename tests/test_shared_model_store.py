@@ -0,0 +1,23 @@
+from sklearn.ensemble import RandomForestClassifier
+from src.pipeline.forest_engine import FlatForest
+from src.pipeline.prediction import PredictionPipeline
+from src.pipeline.shared_model_store import SharedModelStore
+
+
+def test_shared_store_scores_large_batches_with_sklearn(tmp_path, monkeypatch, fitted_model):
+    preprocessor, model, df = fitted_model
+    monkeypatch.setenv("PREDICTION_SHARED_MODEL_DIR", str(tmp_path))
+    monkeypatch.setenv("PREDICTION_FLAT_FOREST_MAX_BATCH", "16")
+    SharedModelStore().publish(model, preprocessor, "model", "production")
+
+    pipeline = PredictionPipeline(model_name="model", version="production", use_shared_store=True)
+    assert isinstance(pipeline.flat_forest, FlatForest)
+
+    records = df.drop(columns="Response").to_dict("records")
+    pipeline.predict_batch(records[:10])
+    assert pipeline._batch_model is None
+
+    results = pipeline.predict_batch(records[:100])
+    assert isinstance(pipeline._batch_model, RandomForestClassifier)
+    expected = model.predict_proba(preprocessor.transform(df.drop(columns="Response")[:100]))[:, 1]
+    assert [result["probability"] for result in results] == list(expected)
@@ -0,0 +1,67 @@
+import os
+import pytest
+from src.pipeline.stage_cache import StageCache, source_closure
+from src.components.data_transformation import DataTransformation
+
+
+def test_source_closure_includes_helper_modules():
+    files = [os.path.relpath(file_path) for file_path in source_closure(DataTransformation.__module__)]
+    assert os.path.join("src", "components", "data_transformation.py") in files
+    assert os.path.join("src", "utils", "rebalancing.py") in files
+    assert os.path.join("src", "utils", "common.py") in files
+
+
+def test_source_closure_follows_relative_and_function_imports(tmp_path, monkeypatch):
+    package = tmp_path / "toy"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "stage.py").write_text("from .helper import f\n")
+    (package / "helper.py").write_text("def f():\n    from toy import lazy\n")
+    (package / "lazy.py").write_text("")
+    (package / "unused.py").write_text("")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    files = [os.path.basename(file_path) for file_path in source_closure("toy.stage", package="toy")]
+    assert sorted(files) == ["__init__.py", "helper.py", "lazy.py", "stage.py"]
+
+
+def test_resume_requires_stage_cache(tmp_path, monkeypatch):
+    from src.pipeline.training import TrainPipeline
+    monkeypatch.setenv("DATA_ROOT_DIR", str(tmp_path))
+    monkeypatch.setenv("PIPELINE_STAGE_CACHE_ENABLED", "false")
+    (tmp_path / "2026_01_01_00_00_00").mkdir()
+    with pytest.raises(ValueError, match="PIPELINE_STAGE_CACHE_ENABLED"):
+        TrainPipeline(resume_date_dir="2026_01_01_00_00_00")
+
+
+class ReportArtifact:
+    def __init__(self, report_file_path, status):
+        self.report_file_path = report_file_path
+        self.status = status
+
+
+def test_reused_outputs_are_linked_into_the_new_run(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATA_ROOT_DIR", str(tmp_path))
+    monkeypatch.setenv("PIPELINE_STAGE_CACHE_ENABLED", "true")
+
+    def run_stage(date_dir):
+        report_file_path = tmp_path / date_dir / "data_validation" / "report.yaml"
+        report_file_path.parent.mkdir(parents=True)
+        report_file_path.write_text("status: true\n")
+        return ReportArtifact(str(report_file_path), True)
+
+    first = StageCache("run_1")
+    first.run("data_validation", lambda: run_stage("run_1"), "key")
+    second = StageCache("run_2")
+    artifact = second.run("data_validation", lambda: pytest.fail("stage should be reused"), "key")
+
+    assert artifact.report_file_path == os.path.join(str(tmp_path), "run_2", "data_validation", "report.yaml")
+    assert open(artifact.report_file_path).read() == "status: true\n"
+    assert artifact.status is True
+    assert second.state["stages"]["data_validation"]["source_date_dir"] == "run_1"
+
+
+def test_missing_data_root_dir_fails_clearly(monkeypatch):
+    from src.pipeline.training import TrainPipeline
+    monkeypatch.delenv("DATA_ROOT_DIR", raising=False)
+    with pytest.raises(ValueError, match="DATA_ROOT_DIR is not set"):
+        TrainPipeline()
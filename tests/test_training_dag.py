@@ -0,0 +1,31 @@
+import tracemalloc
+import numpy as np
+import pytest
+from src.pipeline.training import TrainPipeline
+from src.utils.rebalancing import rebalance
+
+
+def _dependencies(pipeline):
+    return {stage.name: stage.depends_on for stage in pipeline.stages()}
+
+
+@pytest.mark.parametrize("skip, expected", [
+    ("true", ("data_ingestion", "data_drift")),
+    ("false", ("data_ingestion",))
+])
+def test_transformation_waits_for_drift_only_when_skipping(tmp_path, monkeypatch, skip, expected):
+    monkeypatch.setenv("DATA_ROOT_DIR", str(tmp_path))
+    monkeypatch.setenv("DATA_DRIFT_SKIP_RETRAIN_IF_NO_DRIFT", skip)
+    assert _dependencies(TrainPipeline())["data_transformation"] == expected
+
+
+def test_rebalance_does_not_trace_memory():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(20000, 20)).astype(np.float32)
+    y = (rng.random(20000) < 0.1).astype(np.int8)
+    assert not tracemalloc.is_tracing()
+    X_out, y_out, _, report = rebalance("random_over", X, y)
+    assert not tracemalloc.is_tracing()
+    assert report["memory_mb_before"] == round((X.nbytes + y.nbytes) / 2**20, 2)
+    assert report["memory_mb_after"] == round((X_out.nbytes + y_out.nbytes) / 2**20, 2)
+    assert report["memory_mb_after"] > report["memory_mb_before"]